@@ -1,11 +1,20 @@
 import argparse
+import functools
 
 from utils._logging import configure_logging
 from utils._exporter import RedmineExporter
 from utils._importer import JiraImporter
 
 
-def main():
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
+
+@functools.lru_cache(maxsize=1)
+def build_parser():
     parser = argparse.ArgumentParser(description="Jira Issue Importer")
     parser.add_argument("-x", "--activate-extraction", action="store_true",
                         help="Activate and import already extracted issues")
@@ -20,18 +29,26 @@ def main():
     parser.add_argument("-pr", "--priority", type=int,
                         choices=[1, 2, 3, 4, 5],
                         help="Filter issues by priority: 1 (low), 2 (normal), 3 (high), 4 (urgent), 5 (immediate)")
+    parser.add_argument("-r", "--refresh", action="store_true",
+                        help="Clear cached Redmine responses before exporting")
+    parser.add_argument("-j", "--concurrency", type=positive_int,
+                        help="Number of issues exported or imported at the same time (defaults to the config value)")
     parser.add_argument("-d", "--debug", action="store_true",
                         help="Enable debug mode (verbose logging)")
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
 
     configure_logging(args.debug)
 
     try:
         if args.activate_extraction:
-            importer = JiraImporter()
+            importer = JiraImporter(concurrency=args.concurrency)
             importer.import_issues(args.filename)
         else:
-            exporter = RedmineExporter()
+            exporter = RedmineExporter(concurrency=args.concurrency)
             exporter.run(args)
     except Exception as e:
         print("An error occurred:", e)
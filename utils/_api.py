@@ -3,3 +3,57 @@
 # Website https://poltersanctuary.com                                            #
 # Github  https://github.com/PolterEnterprise                                    #
 # ############################################################################## #
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import requests_cache
+    from requests_cache import DO_NOT_CACHE
+except ImportError:
+    requests_cache = None
+    DO_NOT_CACHE = None
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(pool_connections=4, pool_maxsize=16, total_retries=3, backoff_factor=0.5, backoff_jitter=0.5,
+                   status_forcelist=RETRY_STATUS_CODES, respect_retry_after_header=True,
+                   cache_name=None, **cache_options):
+    # A 429/503 with Retry-After is slept off inside urllib3, before the caller ever sees the response.
+    # Without one the backoff gets up to backoff_jitter seconds of random jitter, so workers that
+    # failed together do not all retry in the same instant
+    retries = Retry(
+        total=total_retries,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        status_forcelist=status_forcelist,
+        respect_retry_after_header=respect_retry_after_header
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries)
+
+    # The response cache is optional, without requests-cache installed every call goes to the server
+    if cache_name and requests_cache is not None:
+        session = requests_cache.CachedSession(
+            cache_name=cache_name,
+            backend="sqlite",
+            allowable_methods=("GET",),
+            stale_if_error=True,
+            stale_while_revalidate=True,
+            **cache_options
+        )
+    else:
+        session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def clear_session_cache(session):
+    if requests_cache is not None and isinstance(session, requests_cache.CachedSession):
+        session.cache.clear()
+        return True
+    return False
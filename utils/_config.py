@@ -0,0 +1,19 @@
+# ############################################################################## #
+# Created by Polterx, on Saturday, 1st of July, 2023                             #
+# Website https://poltersanctuary.com                                            #
+# Github  https://github.com/PolterEnterprise                                    #
+# ############################################################################## #
+
+import functools
+
+from configparser import ConfigParser
+
+CONFIG_FILE = 'config.ini'
+
+
+# Parsed once per process, every exporter/importer instance reads from the same parser
+@functools.lru_cache(maxsize=None)
+def load_config(path=CONFIG_FILE):
+    config = ConfigParser()
+    config.read(path)
+    return config
@@ -5,14 +5,41 @@
 # ############################################################################## #
 
 import os
+import shutil
 import sys
 import requests
-import json
-import html
-
-from configparser import ConfigParser
+import logging
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from configparser import NoOptionError, NoSectionError
+from types import MappingProxyType
+from utils._api import DO_NOT_CACHE, clear_session_cache, create_session
+from utils._config import load_config
 from utils._logging import setup_logger, configure_logging
-from utils._ratelimiter import RateLimiter
+from utils._ranges import page_offsets, windows
+from utils._serialization import dumps_line, loads
+from utils._store import AttachmentManifest, JournalStore
+from utils._threads import DOWNLOAD_WORKERS, download_executor, prefetch
+from utils._workers import ProgressWindow, run_in_workers
+
+
+STATUS_NAME_MAP = MappingProxyType({
+    1: 'New',
+    2: 'In-Progress',
+    3: 'Ready-for-Testing',
+    4: 'Feedback',
+    5: 'Closed',
+    6: 'Rejected',
+    7: 'Approved',
+    8: 'Re-Opened',
+    9: 'Wont-Fix',
+    10: 'On-Hold',
+    11: 'Resolved',
+    12: 'In View'
+})
 
 
 class RedmineExportError(Exception):
@@ -32,266 +59,406 @@ class RedmineNotFoundError(RedmineExportError):
 
 class RedmineExporter:
     RESPONSE_CONTENT_TEMPLATE = "Response content: %s"
-
-    def __init__(self):
+    ISSUES_CACHE_EXPIRE_AFTER = 1800  # 30 minutes for issue list pages
+    JOURNALS_CACHE_EXPIRE_AFTER = 60  # 1 minute for single issue details (journals, attachments)
+    MAXIMUM_PAGE_SIZE = 100  # Redmine caps the issues page size at 100 unless the server is reconfigured
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024  # matches typical socket buffer sizes
+    DOWNLOAD_FILE_BUFFER = 1024 * 1024  # coalesces the 64 KiB reads into fewer disk writes
+    ISSUE_PREFETCH = 200  # issues fetched ahead of the workers
+    PAGE_WORKERS = 4  # issue list pages requested at the same time
+    MAXIMUM_RETRIES = 5
+    RETRY_BACKOFF_FACTOR = 1.0  # 1s, 2s, 4s, ... unless the server sends Retry-After
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+    PROGRESS_SAVE_EVERY = 25  # issues between progress file writes
+    PROGRESS_SAVE_SECONDS = 5.0  # or at most this long between writes
+
+    def __init__(self, concurrency=None):
         try:
-            config = ConfigParser()
-            config.read('config.ini')
+            config = load_config()
 
             # Configuration
             self.log_dir = config.get('General', 'log_dir')
             self.log_file = config.get('General', 'log_file')
             self.redmine_url = config.get('Redmine', 'url')
+            self.issues_endpoint = f"{self.redmine_url}/issues.json"
+            self.issue_endpoint_template = f"{self.redmine_url}/issues/%s.json"
             self.redmine_api_key = config.get('Redmine', 'api_key')
             self.attachments_dir = config.get('Exporter', 'attachments_dir')
-            self.rate_limit = config.getint('General', 'rate_limit')
             self.maximum_issues = config.getint('Exporter', 'maximum_issues')
+            # The command line wins over the config, the connection pool below is sized from it
+            self.concurrency = concurrency or config.getint('Exporter', 'concurrency', fallback=4)
+            self.cache_name = config.get('Exporter', 'cache_name', fallback='redmine_cache')
+            self.journal_store_file = config.get('Exporter', 'journal_store', fallback='redmine_journals.sqlite')
+            self.attachment_manifest_file = config.get('Exporter', 'attachment_manifest', fallback='redmine_attachments.sqlite')
 
-            self.rate_limiter = RateLimiter(self.rate_limit)
             self.logger = setup_logger('exporter', self.log_dir, self.log_file)
-        except ConfigParser.NoSectionError as e:
-            raise RedmineExportError(f"Error in configuration file: {str(e)}")
-        except ConfigParser.NoOptionError as e:
-            raise RedmineExportError(f"Missing required option in configuration file: {str(e)}")
-        except Exception as e:
-            raise RedmineExportError(f"Error reading configuration: {str(e)}")
-
-        self.priority_map = {
-            1: '1',  # Low priority
-            2: '2',  # Normal priority
-            3: '3',  # High priority
-            4: '4',  # Urgent priority
-            5: '5'   # Immediate priority
-        }
-
-        self.status_map = {
-            1: '1',   # New issues (The issue is newly created and not yet assigned or in progress.)
-            2: '2',   # In Progress issues (The issue is actively being worked on.)
-            3: '3',   # Ready for Testing issues (The issue is ready for testing or quality assurance.)
-            4: '4',   # Feedback issues (The issue is awaiting feedback or further input.)
-            5: '5',   # Closed issues (The issue has been closed and is considered complete.)
-            6: '6',   # Rejected issues (The issue has been rejected or deemed invalid.)
-            7: '7',   # Approved issues (The issue has been approved and can proceed.)
-            8: '8',   # Re-opened issues (The issue was previously closed but has been reopened for further work.)
-            9: '9',   # Won't Fix issues (The issue will not be fixed or addressed.)
-            10: '10', # On Hold issues
-            11: '11', # Resolved issues (The issue has been resolved or completed.)
-            12: '12'  # In View issues (The issue is being reviewed or examined.)
-        }
-
-        self.status_name_map = {
-            1: 'New',
-            2: 'In-Progress',
-            3: 'Ready-for-Testing',
-            4: 'Feedback',
-            5: 'Closed',
-            6: 'Rejected',
-            7: 'Approved',
-            8: 'Re-Opened',
-            9: 'Wont-Fix',
-            10: 'On-Hold',
-            11: 'Resolved',
-            12: 'In View'
-        }
-
-    def validate_input(self, input_data, input_types):
-        if isinstance(input_data, input_types):
-            return True
-        else:
-            return False
 
-    def sanitize_input(self, input_data):
-        if isinstance(input_data, str):
-            return html.escape(input_data)
-        else:
-            return input_data
+            # One pooled keep-alive session for every Redmine call, sized for the issue workers, the
+            # attachment downloads and the page prefetcher all holding a connection at once.
+            # Throttling is left to the server, 429 and Retry-After are honoured by the retry policy
+            self.session = create_session(
+                pool_maxsize=self.concurrency + DOWNLOAD_WORKERS + self.PAGE_WORKERS,
+                total_retries=self.MAXIMUM_RETRIES,
+                backoff_factor=self.RETRY_BACKOFF_FACTOR,
+                status_forcelist=self.RETRY_STATUS_CODES,
+                cache_name=self.cache_name,
+                expire_after=self.ISSUES_CACHE_EXPIRE_AFTER,
+                urls_expire_after={
+                    "*/issues.json": self.ISSUES_CACHE_EXPIRE_AFTER,
+                    "*/issues/*.json": self.JOURNALS_CACHE_EXPIRE_AFTER,
+                    "*/attachments/*": DO_NOT_CACHE
+                },
+                ignored_parameters=["X-Redmine-API-Key"]
+            )
+            # Sent as a header so the key never shows up in URLs, logs or cache keys
+            self.session.headers.update({
+                "X-Redmine-API-Key": self.redmine_api_key,
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "User-Agent": "redmine-exporter/1.0"
+            })
+            self.content_encoding_logged = False
+            self.journal_store = JournalStore(self.journal_store_file)
+            self.attachment_manifest = AttachmentManifest(self.attachment_manifest_file)
+
+            # Issues are exported from several worker threads, appends to the output file go one at a time
+            self.write_lock = threading.Lock()
+            self.output_file = None
+            self.output = None
+            self.progress_file = None
+            self.progress_index = 0
+            self.progress_dirty_count = 0
+            self.progress_saved_at = time.monotonic()
+            self.total_issues = 0
+            self.seen_issue_ids = set()
+            self.seen_issue_lock = threading.Lock()
+        except NoSectionError as e:
+            raise RedmineExportError(f"Error in configuration file: {e}")
+        except NoOptionError as e:
+            raise RedmineExportError(f"Missing required option in configuration file: {e}")
+        except Exception as e:
+            raise RedmineExportError(f"Error reading configuration: {e}")
 
     def fetch_data(self, endpoint, params):
         try:
-            response = requests.get(endpoint, params=params)
+            response = self.session.get(endpoint, params=params)
             response.raise_for_status()
-            return response.json()
+
+            if not self.content_encoding_logged:
+                self.content_encoding_logged = True
+                self.logger.debug("Redmine response Content-Encoding: %s", response.headers.get('Content-Encoding', 'identity'))
+
+            return loads(response.content)
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"Error connecting to the server: {str(e)}")
+            self.logger.error("Error connecting to the server: %s", e)
+            return None
+        except ValueError as e:
+            self.logger.error("Invalid JSON received from %s: %s", endpoint, e)
             return None
 
-    def fetch_data_with_pagination(self, endpoint, params):
-        data = []
-        offset = 0
-        while True:
-            params["offset"] = offset
-            response_data = self.fetch_data(endpoint, params)
+    def fetch_page(self, endpoint, params, offset):
+        response_data = self.fetch_data(endpoint, {**params, "offset": offset})
+
+        if response_data is None or 'issues' not in response_data:
+            return None
+
+        return response_data
+
+    def fetch_data_with_pagination(self, endpoint, params, offset=0):
+        # The first page tells how many issues there are, the rest is requested a few pages at a
+        # time and yielded in order, so only a handful of pages are ever held in memory
+        first_page = self.fetch_page(endpoint, params, offset)
+        if first_page is None:
+            return
 
-            if response_data is None or 'issues' not in response_data:
-                break
+        self.total_issues = first_page.get("total_count", 0)
+        self.logger.info("Total issues found: %s", self.total_issues)
 
-            current_data = response_data["issues"]
-            data.extend(current_data)
+        page_size = len(first_page["issues"])
+        if page_size == 0:
+            return
 
-            if len(current_data) == 0:
-                break
+        yield from first_page["issues"]
 
-            offset += len(current_data)
-        
-        return data
+        # total_count is known now, the remaining pages can skip the metadata
+        params = {**params, "nometa": 1}
+        remaining_offsets = page_offsets(offset + page_size, self.total_issues, page_size)
 
-    def fetch_issues(self, project_id=None, status=None, priority=None):
-        if not self.validate_input(project_id, (int, str, type(None))):
-            raise ValueError('Invalid project_id. Expected int, str or None.')
-        if not self.validate_input(status, (int, type(None))):
-            raise ValueError('Invalid status. Expected int or None.')
-        if not self.validate_input(priority, (int, type(None))):
-            raise ValueError('Invalid priority. Expected int or None.')
+        with ThreadPoolExecutor(max_workers=self.PAGE_WORKERS, thread_name_prefix="page") as executor:
+            for window in windows(remaining_offsets, self.PAGE_WORKERS):
+                pages = executor.map(lambda page_offset: self.fetch_page(endpoint, params, page_offset), window)
+                for page in pages:
+                    # A failed or empty page means the list ended early (or the server gave up), stop there
+                    if page is None or not page["issues"]:
+                        return
+                    yield from page["issues"]
 
-        params = {"key": self.redmine_api_key}
+    def fetch_issues(self, project_id=None, status=None, priority=None, offset=0):
+        # argparse already types the filters, requests takes care of percent-encoding them
+        params = {}
 
         if project_id:
-            project_id = self.sanitize_input(project_id)
-            self.logger.info(f"Fetching issues for project: {project_id}")
+            self.logger.info("Fetching issues for project: %s", project_id)
             params["project_id"] = project_id
         else:
             self.logger.info("Fetching all issues")
             params["subproject_id"] = "!*"
 
         if status is not None:
-            status = self.sanitize_input(status)
-            params["status_id"] = self.status_map.get(status, str(status))
+            params["status_id"] = str(status)
+
+        if priority is not None:
+            params["priority_id"] = str(priority)
+
+        params["limit"] = min(self.maximum_issues, self.MAXIMUM_PAGE_SIZE)
 
-        if priority:
-            priority = self.sanitize_input(priority)
-            params["priority_id"] = self.priority_map.get(priority, str(priority))
+        # Oldest first, issues created mid-export land on the last page instead of shifting earlier ones
+        params["sort"] = "id"
 
-        params["limit"] = self.maximum_issues
+        # Ship attachment metadata with the issue pages. The list endpoint ignores include=journals,
+        # journals always come from the per issue request
+        params["include"] = "attachments"
 
-        endpoint = f"{self.redmine_url}/issues.json"
-        return self.fetch_data_with_pagination(endpoint, params)
+        return self.fetch_data_with_pagination(self.issues_endpoint, params, offset)
 
-    def fetch_journals(self, issue_id):
-        endpoint = f"{self.redmine_url}/issues/{issue_id}.json"
-        params = {"key": self.redmine_api_key, "include": "journals"}
+    def fetch_issue_detail(self, issue_id):
+        endpoint = self.issue_endpoint_template % issue_id
+        params = {"include": "journals,attachments"}
 
         data = self.fetch_data(endpoint, params)
 
         if data is None or 'issue' not in data:
             return None
 
-        journals = data["issue"].get("journals", [])
+        return data["issue"]
+
+    def load_issue_metadata(self, issue):
+        issue_id = issue["id"]
+        updated_on = issue.get("updated_on")
+
+        # Metadata that came with the issue page is taken off the issue, it is exported separately
+        journals = issue.pop("journals", None)
+        attachments = issue.pop("attachments", None)
+
+        if journals is None and updated_on:
+            journals = self.journal_store.get(issue_id, updated_on)
+            if journals is not None and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Issue %s unchanged since %s, reusing stored journals", issue_id, updated_on)
+
+        # Whatever is still missing comes from a single detail request
+        if journals is None or attachments is None:
+            detail = self.fetch_issue_detail(issue_id) or {}
+
+            if journals is None and "journals" in detail:
+                journals = detail["journals"]
+                if updated_on:
+                    self.journal_store.put(issue_id, updated_on, journals)
+
+            if attachments is None:
+                attachments = detail.get("attachments", [])
+
+        return journals, attachments
+
+    def process_journals(self, issue_id, journals):
         total_journals = len(journals)
 
-        self.logger.info(f"Total journals found for issue ({issue_id}): {total_journals}")
+        self.logger.info("Total journals found for issue (%s): %s", issue_id, total_journals)
 
         journals_data = []
         for index, journal in enumerate(journals, start=1):
-            self.logger.info(f"Processing journal: {index}/{total_journals}")
+            self.logger.info("Processing journal: %s/%s", index, total_journals)
             try:
-                parsed_journal = self.parse_journals([journal])[0]
-                self.logger.info(f"Successfully fetched and processed journal: {index}")
+                parsed_journal = self.parse_journal(journal)
+                self.logger.info("Successfully fetched and processed journal: %s", index)
                 journals_data.append(parsed_journal)
             except Exception as e:
-                self.logger.error(f"Error processing journal {index} for issue {issue_id}: {str(e)}")
+                self.logger.error("Error processing journal %s for issue %s: %s", index, issue_id, e)
                 continue
 
-        self.logger.info(f"Journals processing completed for issue {issue_id}")
+        self.logger.info("Journals processing completed for issue %s", issue_id)
         return journals_data
 
     def parse_journals(self, journals):
-        journals_data = []
-        for journal in journals:
-            journal_id = journal.get("id")
-            user = journal.get("user", {})
-            created_on = journal.get("created_on")
-            notes = journal.get("notes")
-
-            comments = notes.split("\r\n") if notes else []
-
-            entry = {
-                "id": journal_id,
-                "user": {
-                    "id": user.get("id"),
-                    "name": user.get("name")
-                },
-                "created_on": created_on,
-                "notes": notes,
-                "private_notes": journal.get("private_notes"),
-                "comments": comments
-            }
+        return [self.parse_journal(journal) for journal in journals]
+
+    def parse_journal(self, journal):
+        user = journal.get("user", {})
+        notes = journal.get("notes")
+
+        # splitlines also copes with notes that mix \r\n and bare \n
+        comments = notes.splitlines() if notes else []
+
+        return {
+            "id": journal.get("id"),
+            "user": {
+                "id": user.get("id"),
+                "name": user.get("name")
+            },
+            "created_on": journal.get("created_on"),
+            "notes": notes,
+            "private_notes": journal.get("private_notes"),
+            "comments": comments
+        }
 
-            journals_data.append(entry)
+    def fetch_attachments(self, issue_id, attachments):
+        total_attachments = len(attachments)
 
-        return journals_data
+        self.logger.info("Total attachments found for issue (%s): %s", issue_id, total_attachments)
+
+        if attachments:
+            os.makedirs(os.path.join(self.attachments_dir, str(issue_id)), exist_ok=True)
+
+        futures = [
+            (attachment["filename"], download_executor.submit(self._download_one, issue_id, attachment, index, total_attachments))
+            for index, attachment in enumerate(attachments, start=1)
+        ]
+        # Collected in attachment order, the export lists exactly the files this issue has on disk
+        saved_filenames = []
+        downloaded = []
+        for filename, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                self.logger.error("Error downloading attachment (%s) for issue %s: %s", filename, issue_id, e)
+                continue
+            if result is None:
+                continue
+
+            saved_filenames.append(filename)
+            manifest_row = result[1]
+            if manifest_row is not None:
+                downloaded.append(manifest_row)
+
+        self.attachment_manifest.add(downloaded)
+        self.logger.info("Attachment processing completed for issue %s", issue_id)
+        return saved_filenames
 
-    def fetch_attachments(self, issue_id):
-        endpoint = f"{self.redmine_url}/issues/{issue_id}.json"
-        params = {"key": self.redmine_api_key, "include": "attachments"}
+    def reuse_attachment(self, attachment, dest_path):
+        expected_size = attachment.get("filesize")
+        if os.path.isfile(dest_path) and os.path.getsize(dest_path) == expected_size:
+            return True
+
+        # Without a digest there is nothing to tell two files of the same size apart
+        digest = attachment.get("digest")
+        if not digest or not expected_size:
+            return False
+
+        source_path = self.attachment_manifest.get(digest, expected_size)
+        if source_path is None or source_path == dest_path:
+            return False
+        if not os.path.isfile(source_path) or os.path.getsize(source_path) != expected_size:
+            return False
 
         try:
-            data = self.fetch_data(endpoint, params)
+            os.link(source_path, dest_path)
+        except OSError:
+            # Hard links are not available everywhere (other volumes, some Windows setups)
+            shutil.copyfile(source_path, dest_path)
+        return True
+
+    def partial_size(self, attachment, dest_path):
+        # A file shorter than the size Redmine reports is what an interrupted download leaves behind
+        expected_size = attachment.get("filesize")
+        if not expected_size or not os.path.isfile(dest_path):
+            return 0
+        size = os.path.getsize(dest_path)
+        return size if size < expected_size else 0
 
-            if data is None or 'issue' not in data or 'attachments' not in data['issue']:
-                return None
+    def _download_one(self, issue_id, attachment, index, total):
+        attachment_url = attachment["content_url"]
+        attachment_filename = attachment["filename"]
+        dest_path = os.path.join(self.attachments_dir, str(issue_id), attachment_filename)
 
-            attachments = data["issue"]["attachments"]
-            total_attachments = len(attachments)
+        if self.reuse_attachment(attachment, dest_path):
+            self.logger.info("Attachment (%s) already downloaded, reused for issue %s: %s/%s", attachment_filename, issue_id, index, total)
+            return attachment_filename, None
 
-            self.logger.info(f"Total attachments found for issue ({issue_id}): {total_attachments}")
+        resume_from = self.partial_size(attachment, dest_path)
+        attachment_content = self.fetch_attachment_content(attachment_url, attachment_filename, index, total, resume_from)
+        if attachment_content is None:
+            return None
 
-            for index, attachment in enumerate(attachments, start=1):
-                attachment_url = attachment["content_url"]
-                attachment_filename = attachment["filename"]
+        # Servers that ignore Range answer 200 with the whole file, which then overwrites the partial one
+        append = resume_from > 0 and attachment_content.status_code == 206
+        if append:
+            self.logger.info("Resuming attachment (%s) from byte %s", attachment_filename, resume_from)
 
-                attachment_content = self.fetch_attachment_content(attachment_url, attachment_filename, index, total_attachments)
-                if attachment_content is not None:
-                    self.save_attachment(issue_id, attachment_filename, attachment_content, index)
+        # Closed on every path, a failed copy still hands its pooled connection back
+        with attachment_content:
+            saved_bytes = self.save_attachment(issue_id, attachment_filename, attachment_content, index, append)
+        if saved_bytes is None:
+            self.discard_partial(attachment, dest_path)
+            return None
 
-            self.logger.info(f"Attachment processing completed for issue {issue_id}")
-        except requests.exceptions.HTTPError as errh:
-            self.logger.error(f"Http Error while fetching issue from {endpoint}: {errh}")
-        except requests.exceptions.ConnectionError as errc:
-            self.logger.error(f"Error Connecting while fetching issue from {endpoint}: {errc}")
-        except requests.exceptions.Timeout as errt:
-            self.logger.error(f"Timeout Error while fetching issue from {endpoint}: {errt}")
-        except requests.exceptions.RequestException as err:
-            self.logger.error(f"Oops: Something Else while fetching issue from {endpoint}: {err}")
+        # Only a complete file is offered to other issues, a resumed download is checked on its total size
+        digest = attachment.get("digest")
+        expected_size = attachment.get("filesize")
+        if digest and expected_size and os.path.getsize(dest_path) == expected_size:
+            return attachment_filename, (digest, expected_size, dest_path)
+        return attachment_filename, None
+
+    def discard_partial(self, attachment, dest_path):
+        # A prefix of a file whose size Redmine reports is kept on purpose, the next run resumes it with a Range
+        # request (see partial_size). Anything else cannot be resumed and is removed
+        if self.partial_size(attachment, dest_path):
+            self.logger.info("Keeping partial attachment %s, the next run resumes it", dest_path)
+            return
+        try:
+            os.remove(dest_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.error("Could not remove partial attachment %s: %s", dest_path, e)
+
+    def fetch_attachment_content(self, attachment_url, attachment_name, index, total, resume_from=0):
+        headers = None
+        if resume_from:
+            # Identity encoding keeps the range offsets in file bytes rather than gzip bytes
+            headers = {"Range": f"bytes={resume_from}-", "Accept-Encoding": "identity"}
 
-    def fetch_attachment_content(self, attachment_url, attachment_name, index, total):
         try:
-            self.logger.info(f"Processing attachment ({attachment_name}): {index}/{total}")
-            attachment_response = requests.get(attachment_url, stream=True)
+            self.logger.info("Processing attachment (%s): %s/%s", attachment_name, index, total)
+            attachment_response = self.session.get(attachment_url, stream=True, headers=headers)
             attachment_response.raise_for_status()
             return attachment_response
         except requests.exceptions.HTTPError as errh:
-            self.logger.error(f"Fetching attachment ({index}) from ({attachment_url}) failed: Http Error: {errh}")
+            self.logger.error("Fetching attachment (%s) from (%s) failed: Http Error: %s", index, attachment_url, errh)
+            # The error body was never read, closing hands the streamed connection back to the pool
+            if errh.response is not None:
+                errh.response.close()
             return None
         except requests.exceptions.ConnectionError as errc:
-            self.logger.error(f"Fetching attachment ({index}) from ({attachment_url}) failed: Error Connecting: {errc}")
+            self.logger.error("Fetching attachment (%s) from (%s) failed: Error Connecting: %s", index, attachment_url, errc)
             return None
         except requests.exceptions.Timeout as errt:
-            self.logger.error(f"Fetching attachment ({index}) from ({attachment_url}) failed: Timeout Error: {errt}")
+            self.logger.error("Fetching attachment (%s) from (%s) failed: Timeout Error: %s", index, attachment_url, errt)
             return None
         except requests.exceptions.RequestException as err:
-            self.logger.error(f"Fetching attachment ({index}) from ({attachment_url}) failed: Something Else: {err}")
+            self.logger.error("Fetching attachment (%s) from (%s) failed: Something Else: %s", index, attachment_url, err)
             return None
 
-    def save_attachment(self, issue_id, attachment_filename, attachment_content, index):
+    def save_attachment(self, issue_id, attachment_filename, attachment_content, index, append=False):
         try:
             attachment_path = os.path.join(self.attachments_dir, str(issue_id))
-            os.makedirs(attachment_path, exist_ok=True)
-            
-            with open(os.path.join(attachment_path, attachment_filename), "wb") as file:
-                chunk_size = 50 * 1024 * 1024  # 50MB chunk size
-                for chunk in attachment_content.iter_content(chunk_size=chunk_size):
-                    file.write(chunk)
-            self.logger.info(f"Successfully fetched and saved attachment ({attachment_filename}): {index} ")
+
+            # Let urllib3 undo any transfer gzip and copy the raw stream straight into the file
+            attachment_content.raw.decode_content = True
+            mode = "ab" if append else "wb"
+            with open(os.path.join(attachment_path, attachment_filename), mode, buffering=self.DOWNLOAD_FILE_BUFFER) as file:
+                shutil.copyfileobj(attachment_content.raw, file, length=self.DOWNLOAD_CHUNK_SIZE)
+                saved_bytes = file.tell()
+            self.logger.info("Successfully fetched and saved attachment (%s): %s ", attachment_filename, index)
+            return saved_bytes
         except PermissionError:
-            self.logger.error(f"Permission denied while saving attachment for issue {issue_id}. Check if the program has write access to the destination directory.")
+            self.logger.error("Permission denied while saving attachment for issue %s. Check if the program has write access to the destination directory.", issue_id)
         except IOError as e:
-            self.logger.error(f"I/O error({e.errno}): {e.strerror} while saving attachment for issue {issue_id}.")
+            self.logger.error("I/O error(%s): %s while saving attachment for issue %s.", e.errno, e.strerror, issue_id)
         except Exception as e:
-            self.logger.error(f"Unexpected error occurred while saving attachment for issue {issue_id}: {str(e)}")
+            self.logger.error("Unexpected error occurred while saving attachment for issue %s: %s", issue_id, e)
 
     def prepare_issue_data(self, issue, journals, attachments):
         if 'id' not in issue:
-            self.logger.error(f"Issue does not contain 'id' key: {issue}")
+            self.logger.error("Issue does not contain 'id' key: %s", issue)
             return None
 
         issue_data = {
@@ -301,79 +468,197 @@ class RedmineExporter:
         }
         return issue_data
 
-    def process_issue(self, issue, output_file):
+    def process_issue(self, issue):
         try:
             try:
-                journals = self.fetch_journals(issue["id"])  
+                journals, attachments = self.load_issue_metadata(issue)
+                if journals is not None:
+                    journals = self.process_journals(issue["id"], journals)
             except Exception as e:
-                self.logger.error(f"Error fetching journals for issue {issue['id']}: {str(e)}")
+                self.logger.error("Error fetching journals for issue %s: %s", issue['id'], e)
                 return
 
             try:
-                attachments = self.fetch_attachments(issue["id"])  
+                attachments = self.fetch_attachments(issue["id"], attachments)
             except Exception as e:
-                self.logger.error(f"Error fetching attachments for issue {issue['id']}: {str(e)}")
+                self.logger.error("Error fetching attachments for issue %s: %s", issue['id'], e)
                 return
 
-            attachments_path = os.path.join(self.attachments_dir, str(issue["id"]))
-            if os.path.exists(attachments_path):
-                attachments = os.listdir(attachments_path)
-
             try:
                 issue_data = self.prepare_issue_data(issue, journals, attachments)
             except Exception as e:
-                self.logger.error(f"Error preparing data for issue {issue['id']}: {str(e)}")
+                self.logger.error("Error preparing data for issue %s: %s", issue['id'], e)
                 return
 
             if issue_data is None:
-                self.logger.error(f"Failed to prepare data for issue {issue['id']}.")
+                self.logger.error("Failed to prepare data for issue %s.", issue['id'])
                 return
 
-            self.export_data(issue_data, output_file)
+            self.export_data([issue_data])
         except (RedmineAuthenticationError, RedminePermissionError, RedmineNotFoundError) as e:
-            self.logger.warning(str(e))
+            self.logger.warning("%s", e)
         except KeyboardInterrupt:
             self.logger.info("Script interrupted by user. Current issue will finish processing before exiting.")
             raise  # re-raise the exception to be caught in the run method
         except Exception as e:
-            self.logger.error(f"Error processing issue {issue['id']}: {str(e)}")
+            self.logger.error("Error processing issue %s: %s", issue['id'], e)
 
-    def export_data(self, data, output_file):
+    def export_data(self, records):
+        records = list(records)
+        issue_ids = ", ".join(str(record["issue"]["id"]) for record in records)
         try:
-            with open(output_file, "a") as file:
-                file.write(json.dumps(data) + "\n")
-            self.logger.info(f"Successfully exported data for issue {data['issue']['id']}.")
+            # Serialize before taking the lock, other workers only wait for the buffered copy
+            lines = [dumps_line(record) for record in records]
+            with self.write_lock:
+                self.output.writelines(lines)
+            self.logger.info("Successfully exported data for issue %s.", issue_ids)
         except IOError as e:
-            self.logger.error(f"IOError while trying to write to {output_file} for issue {data['issue']['id']}: {str(e)}")
+            self.logger.error("IOError while trying to write to %s for issue %s: %s", self.output_file, issue_ids, e)
         except TypeError as e:
-            self.logger.error(f"TypeError while trying to convert data to JSON for issue {data['issue']['id']}: {str(e)}")
+            self.logger.error("TypeError while trying to convert data to JSON for issue %s: %s", issue_ids, e)
         except Exception as e:
-            self.logger.error(f"Unexpected error while trying to export data for issue {data['issue']['id']}: {str(e)}")
+            self.logger.error("Unexpected error while trying to export data for issue %s: %s", issue_ids, e)
+
+    def claim_issue(self, issue_id):
+        with self.seen_issue_lock:
+            if issue_id in self.seen_issue_ids:
+                return False
+            self.seen_issue_ids.add(issue_id)
+            return True
+
+    def export_issue(self, index, issue):
+        # Offset paging can hand out the same issue twice when the list moves underneath it, and a resume
+        # starts with every issue already in the output
+        if not self.claim_issue(issue['id']):
+            self.logger.info("Issue (%s) already exported, skipping: %s/%s", issue['id'], index, self.total_issues)
+            return
+
+        self.logger.info("Processing issue (%s): %s/%s", issue['id'], index, self.total_issues)
+        self.process_issue(issue)
+
+    def process_issues(self, issues, start_index, progress_file):
+        progress = ProgressWindow(start_index)
+
+        def on_complete(index, future):
+            if future.exception() is not None:
+                self.logger.error("Error exporting issue at index %s: %s", index, future.exception())
+            self.save_progress(progress.complete(index), progress_file)
+
+        run_in_workers(self.export_issue, enumerate(issues, start_index + 1), self.concurrency, on_complete)
+
+    def open_output(self, output_file):
+        # Held open for the whole run, records are buffered and only forced to disk alongside the progress marker
+        self.output_file = output_file
+        self.output = open(output_file, "ab", buffering=1024 * 1024)
+
+    def flush_output(self):
+        # Returns the size of the output on disk, every record up to that byte is complete
+        if self.output is None:
+            return None
+        with self.write_lock:
+            self.output.flush()
+            os.fsync(self.output.fileno())
+            return os.fstat(self.output.fileno()).st_size
+
+    def close_output(self):
+        if self.output is None:
+            return
+        self.flush_output()
+        self.output.close()
+        self.output = None
 
     def save_progress(self, current_issue_index, progress_file):
-        with open(progress_file, "w") as file:
-            file.write(str(current_issue_index))
+        self.progress_file = progress_file
+        self.progress_index = current_issue_index
+        self.progress_dirty_count += 1
+
+        if (self.progress_dirty_count >= self.PROGRESS_SAVE_EVERY
+                or time.monotonic() - self.progress_saved_at >= self.PROGRESS_SAVE_SECONDS):
+            self.write_progress()
+
+    def write_progress(self):
+        if self.progress_file is None or self.progress_dirty_count == 0:
+            return
+
+        # The output size goes along with the index, records appended after it are cut off on resume
+        output_size = self.flush_output()
+        entry = str(self.progress_index) if output_size is None else f"{self.progress_index},{output_size}"
+
+        # Write to a sibling temp file and swap it in, a crash never leaves a truncated progress file
+        progress_dir = os.path.dirname(os.path.abspath(self.progress_file))
+        with tempfile.NamedTemporaryFile("w", dir=progress_dir, delete=False) as file:
+            file.write(entry)
+        os.replace(file.name, self.progress_file)
+
+        self.progress_dirty_count = 0
+        self.progress_saved_at = time.monotonic()
 
     def load_progress(self, progress_file):
+        # "<index>,<output size>", progress files from before the size was recorded hold only the index.
+        # Without a progress file there is no size to trust, the output is kept and its ids are skipped instead
         if not os.path.exists(progress_file):
-            return 0
+            return 0, None
         with open(progress_file, "r") as file:
-            return int(file.read())
+            index, _, output_size = file.read().strip().partition(",")
+        return int(index), int(output_size) if output_size else None
+
+    def load_exported_ids(self, output_file):
+        # Workers finish out of order, so the output holds issues past the saved index too. Seeding the
+        # seen set from it keeps a resumed run from exporting those a second time
+        exported_ids = set()
+        with open(output_file, "rb", buffering=1024 * 1024) as file:
+            for line in file:
+                try:
+                    exported_ids.add(loads(line)["issue"]["id"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return exported_ids
+
+    def truncate_output(self, output_file, output_size):
+        # Issues past the saved index are exported again on resume, their records (and any half-written
+        # last line) are cut off instead of ending up twice in the output
+        if output_size is None or os.path.getsize(output_file) <= output_size:
+            return
+        with open(output_file, "r+b") as file:
+            file.truncate(output_size)
+        self.logger.info("Truncated %s to the %s bytes saved with the last progress", output_file, output_size)
 
     def setup_attachments_directory(self):
         os.makedirs(self.attachments_dir, exist_ok=True)
 
+    def clear_cache(self):
+        self.journal_store.clear()
+        if clear_session_cache(self.session):
+            self.logger.info("Cleared cached Redmine responses")
+        else:
+            self.logger.info("Response cache is not enabled, cleared stored journals only")
+
+    def close(self):
+        self.session.close()
+        self.journal_store.close()
+        self.attachment_manifest.close()
+
     def run(self, args):
+        # __init__ already opened the session and both sqlite stores, they are closed however the export ends
+        try:
+            self.export_issues(args)
+        finally:
+            self.close()
+
+    def export_issues(self, args):
         configure_logging(args.debug)
 
         self.setup_attachments_directory()
 
+        if args.refresh:
+            self.clear_cache()
+
         if not args.project:
             self.logger.info("No project specified.")
             return
 
         status_id = args.status  # This should be the integer status id
-        status_name = self.status_name_map.get(status_id, "any").replace(' ', '-')
+        status_name = STATUS_NAME_MAP.get(status_id, "any").replace(' ', '-')
 
         project_name = args.project.replace(' ', '-')
 
@@ -398,12 +683,14 @@ class RedmineExporter:
             if user_choice == "1":
                 os.remove(output_file)
                 os.remove(progress_file)
-                self.logger.info(f"Deleted file: {output_file}")
-                self.logger.info(f"Deleted file: {progress_file}")
+                self.logger.info("Deleted file: %s", output_file)
+                self.logger.info("Deleted file: %s", progress_file)
                 current_issue_index = 0
             elif user_choice == "2":
-                current_issue_index = self.load_progress(progress_file)
-                self.logger.info(f"Resuming from issue index: {current_issue_index}")
+                current_issue_index, output_size = self.load_progress(progress_file)
+                self.truncate_output(output_file, output_size)
+                self.seen_issue_ids = self.load_exported_ids(output_file)
+                self.logger.info("Resuming from issue index: %s", current_issue_index)
             elif user_choice == "3":
                 self.logger.info("Exiting...")
                 return
@@ -413,23 +700,21 @@ class RedmineExporter:
         else:
             current_issue_index = 0
 
-        issues = self.fetch_issues(args.project, args.status, args.priority)
-        self.logger.info(f"Total issues found: {len(issues)}")
-
-        rate_limiter = RateLimiter(self.rate_limit)
-
         try:
-            for i, issue in enumerate(issues[current_issue_index:], current_issue_index + 1):
-                self.logger.info(f"Processing issue ({issue['id']}): {i}/{len(issues)}")
-                self.process_issue(issue, output_file)
-                rate_limiter.wait()
-                self.save_progress(i, progress_file)
+            # Pagination starts at the resume point, already exported pages are never fetched again
+            issues = self.fetch_issues(args.project, args.status, args.priority, offset=current_issue_index)
+            issues = prefetch(issues, maxsize=self.ISSUE_PREFETCH)
+            self.open_output(output_file)
+            self.process_issues(issues, current_issue_index, progress_file)
         except KeyboardInterrupt:
             sys.exit(0)
         except (RedmineAuthenticationError, RedminePermissionError, RedmineNotFoundError) as e:
-            self.logger.warning(str(e))
+            self.logger.warning("%s", e)
         except Exception as e:
-            self.logger.error(f"Error: {str(e)}")
+            self.logger.error("Error: %s", e)
+        finally:
+            self.write_progress()
+            self.close_output()
 
         self.logger.info("Issue export completed.")
 
@@ -6,18 +6,74 @@
 
 import os
 import sys
+import stat
+import base64
+import time
 import requests
-import json
-import html
-import copy
+import itertools
 import mimetypes
 
-from requests.auth import HTTPBasicAuth
-from html import escape
+from collections import deque
 
-from configparser import ConfigParser, NoSectionError, NoOptionError
+from contextlib import ExitStack
+from types import MappingProxyType
+
+from configparser import NoSectionError, NoOptionError
+from utils._api import create_session
+from utils._config import load_config
 from utils._logging import setup_logger, configure_logging
 from utils._ratelimiter import RateLimiter
+from utils._serialization import dumps, dumps_line, loads
+from utils._workers import ProgressWindow, run_in_workers
+
+# requests-toolbelt is optional, without it requests builds each multipart upload in memory
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
+
+# for patch v1.0.4
+FIELDS_MAPPINGS = MappingProxyType({
+    "subject": {"mapping": "summary", "type": str, "sanitize": True},
+    "description": {"mapping": "description", "type": str, "sanitize": True},
+    "author": {"mapping": "reporter", "type": dict, "sanitize": True},
+    "assigned_to": {"mapping": "assignee", "type": dict, "sanitize": True},
+    "project": {"mapping": "project", "type": dict, "sanitize": True},  # Assuming project maps to category
+    "priority": {"mapping": "priority", "type": dict, "sanitize": True},
+    "start_date": {"mapping": "customfield_10015", "type": str, "sanitize": False},
+    "due_date": {"mapping": "duedate", "type": str, "sanitize": False},
+    "created_on": {"mapping": "customfield_10075", "type": str, "sanitize": False},
+    "updated_on": {"mapping": "customfield_10076", "type": str, "sanitize": False},
+    "closed_on": {"mapping": "customfield_10077", "type": str, "sanitize": False},
+    "estimated_hours": {"mapping": "customfield_10078", "type": int, "sanitize": False},
+    "labels": {"mapping": "labels", "type": list, "sanitize": True},  # For Labels, it will depend on how those are structured in your input
+    "fix_versions": {"mapping": "fixVersions", "type": list, "sanitize": True},  # For Fix Versions, it will depend on how those are structured in your input
+    "attachments": {"mapping": "attachments", "type": list, "sanitize": True},  # For Attachments, may require special handling, depending on their structure
+    "journals": {"mapping": "journals", "type": list, "sanitize": True},  # For Journals, may require special handling, depending on their structure
+})
+
+STATUS_MAPPINGS = MappingProxyType({
+    "New": {"mapping": "1", "type": int, "sanitize": False},
+    "In Progress": {"mapping": "2", "type": int, "sanitize": False},
+    "Ready For Testing": {"mapping": "3", "type": int, "sanitize": False},
+    "Feedback": {"mapping": "4", "type": int, "sanitize": False},
+    "Closed": {"mapping": "5", "type": int, "sanitize": False},
+    "Rejected": {"mapping": "6", "type": int, "sanitize": False},
+    "Approved": {"mapping": "7", "type": int, "sanitize": False},
+    "Re-Opened": {"mapping": "8", "type": int, "sanitize": False},
+    "Won't Fix": {"mapping": "9", "type": int, "sanitize": False},
+    "On Hold": {"mapping": "10", "type": int, "sanitize": False},
+    "In Review": {"mapping": "11", "type": int, "sanitize": False},
+})
+
+PRIORITY_MAPPINGS = MappingProxyType({
+    "(1) Immediate": {"mapping": "Highest", "type": str, "sanitize": False},
+    "(2) Urgent": {"mapping": "High", "type": str, "sanitize": False},
+    "(3) High": {"mapping": "Medium", "type": str, "sanitize": False},
+    "(4) Normal": {"mapping": "Low", "type": str, "sanitize": False},
+    "(5) Low": {"mapping": "Lowest", "type": str, "sanitize": False},
+})
 
 
 class JiraExportError(Exception):
@@ -58,16 +114,42 @@ class JiraAttachmentError(JiraExportError):
 
 class JiraImporter:
     RESPONSE_CONTENT_TEMPLATE = "Response content: %s"
-
-    def __init__(self):
+    RETRY_STATUS_CODES = (429, 502, 503, 504)
+    REQUIRED_ISSUE_FIELDS = ("id", "subject", "description", "tracker", "status")
+    DATE_FIELDS = ("start_date", "due_date", "created_on", "updated_on", "closed_on")
+    INPUT_BUFFER = 8 * 1024 * 1024  # export files run to hundreds of MB, read them in large blocks
+    UPLOAD_BUFFER = 1024 * 1024  # attachment reads while streaming an upload
+    WARM_UP_TIMEOUT = 5
+    MAXIMUM_BULK_SIZE = 50  # Jira rejects issue/bulk requests with more issues than this
+    # Status code -> exception raised by handle_http_error, any other 5xx is a JiraServerError
+    HTTP_ERRORS = MappingProxyType({
+        400: (JiraBadRequestError, 'Bad request'),
+        401: (JiraAuthenticationError, 'Invalid Jira credentials'),
+        403: (JiraPermissionError, 'Jira permission error'),
+        404: (JiraNotFoundError, 'Jira issue not found'),
+        408: (JiraRequestTimeoutError, 'Request Timeout'),
+        429: (JiraTooManyRequestsError, 'Too Many Requests'),
+    })
+    # Same output as html.escape, in one pass instead of five str.replace calls
+    HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+    LABEL_TABLE = str.maketrans(" ", "_")  # Jira labels cannot contain spaces
+    JSON_HEADERS = {"Content-Type": "application/json"}
+    MAXIMUM_THROTTLE_RETRIES = 5  # resends of a POST that Jira answered with 429
+    CHECKPOINT_SAVE_EVERY = 25  # checkpoint advances between writes
+    CHECKPOINT_SAVE_SECONDS = 5.0  # or at most this long between writes
+    # Steps of one issue in order, the done file records the last one finished so a resume picks up after it
+    ISSUE_PHASES = ("created", "attachments", "comments", "status")
+    CHECKPOINT_WIDTH = 32  # checkpoint is overwritten in place, padded so a shorter entry never leaves digits behind
+
+    def __init__(self, concurrency=None):
         try:
-            config = ConfigParser()
-            config.read('config.ini')
+            config = load_config()
 
             config_params = {
                 "log_dir": {"section": "General", "key": "log_dir"},
                 "log_file": {"section": "General", "key": "log_file"},
                 "rate_limit": {"section": "General", "key": "rate_limit"},
+                "minimum_rate_limit": {"section": "General", "key": "minimum_rate_limit", "fallback": None},
                 "jira_url": {"section": "Jira", "key": "url"},
                 "jira_email": {"section": "Jira", "key": "email"},
                 "jira_api_key": {"section": "Jira", "key": "api_key"},
@@ -75,233 +157,264 @@ class JiraImporter:
                 "attachments_dir": {"section": "Importer", "key": "attachments_dir"},
                 "allowed_file_types": {"section": "Importer", "key": "allowed_file_types"},
                 "maximum_file_size": {"section": "Importer", "key": "maximum_file_size"},
+                "concurrency": {"section": "Importer", "key": "concurrency", "fallback": "4"},
+                "bulk_size": {"section": "Importer", "key": "bulk_size", "fallback": "1"},
             }
 
+            # Keys added after the first release carry a fallback, config files written before them keep working
             for attribute, params in config_params.items():
-                config_value = config.get(params["section"], params["key"])
+                if "fallback" in params:
+                    config_value = config.get(params["section"], params["key"], fallback=params["fallback"])
+                else:
+                    config_value = config.get(params["section"], params["key"])
                 if attribute == "allowed_file_types":
-                    setattr(self, attribute, config_value.split(','))
+                    setattr(self, attribute, frozenset(file_type.strip().lower().lstrip('.') for file_type in config_value.split(',')))
                 else:
                     setattr(self, attribute, config_value)
 
-            self.auth = HTTPBasicAuth(self.jira_email, self.jira_api_key)
-            self.rate_limiter = RateLimiter(delay=float(self.rate_limit))
+            # Converted once here rather than on every attachment
+            self.maximum_file_size = int(self.maximum_file_size)
+            self.rate_limit = float(self.rate_limit)
+            # Without a minimum the limiter never goes faster than rate_limit, it only backs off from it
+            if self.minimum_rate_limit is not None:
+                self.minimum_rate_limit = float(self.minimum_rate_limit)
+            self.bulk_size = max(1, min(int(self.bulk_size), self.MAXIMUM_BULK_SIZE))
+
+            # Endpoints built once, the per-issue calls only fill in the issue key
+            self.issue_endpoint = f"{self.jira_url}issue/"
+            self.bulk_issue_endpoint = f"{self.jira_url}issue/bulk"
+            self.field_endpoint = f"{self.jira_url}field"
+            self.user_search_endpoint = f"{self.jira_url}user/search"
+            self.myself_endpoint = f"{self.jira_url}myself"
+            self.attachments_endpoint_template = f"{self.jira_url}issue/%s/attachments"
+            self.comment_endpoint_template = f"{self.jira_url}issue/%s/comment"
+            self.transitions_endpoint_template = f"{self.jira_url}issue/%s/transitions"
+
+            # Same target project on every issue, the payloads share this dict and never modify it
+            self.project_field = {"key": self.jira_project_key}
+
+            # The command line wins over the config, the connection pool below is sized from it
+            self.concurrency = concurrency or int(self.concurrency)
+            # Basic credentials encoded once, HTTPBasicAuth would base64 them again on every request
+            token = base64.b64encode(f"{self.jira_email}:{self.jira_api_key}".encode()).decode()
+            self.auth_header = {"Authorization": f"Basic {token}"}
+            self.rate_limiter = RateLimiter(delay=self.rate_limit, minimum_delay=self.minimum_rate_limit)
             self.logger = setup_logger('importer', self.log_dir, self.log_file)
 
+            # One keep-alive session for every Jira call instead of a new connection and TLS handshake each time.
+            # Only idempotent requests are retried, a failed issue POST is never sent twice
+            self.session = create_session(pool_maxsize=self.concurrency, status_forcelist=self.RETRY_STATUS_CODES)
+            self.session.headers.update(self.auth_header)
+            self.session.headers.update({"Accept": "application/json"})
+            self.session.hooks["response"].append(self.observe_rate_limit)
+
+            self.checkpoint = None
+            self.checkpoint_position = None
+            self.checkpoint_dirty_count = 0
+            self.checkpoint_saved_at = 0.0
+            # Redmine id -> (Jira key, last finished phase, journals handled) of issues already created,
+            # and the append-only file they are recorded in
+            self.done_ids = {}
+            self.done_fd = None
+
+            # Field list fetched once from Jira on first use, name -> id
+            self.field_ids = None
+            # Redmine user name -> Jira user (None when Jira has no match), the same people appear on most issues
+            self.users = {}
+            # Issue type -> (initial status, {target status: transition id}), all lower-cased
+            self.workflows = {}
+
         except NoSectionError as e:
-            raise JiraExportError(f"Error in configuration file: {str(e)}")
+            raise JiraExportError(f"Error in configuration file: {e}")
         except NoOptionError as e:
-            raise JiraExportError(f"Missing required option in configuration file: {str(e)}")
+            raise JiraExportError(f"Missing required option in configuration file: {e}")
         except Exception as e:
-            raise JiraExportError(f"Error reading configuration: {str(e)}")
-
-        # for patch v1.0.4
-        self.fields_mappings = {
-            "subject": {"mapping": "summary", "type": str, "sanitize": True},
-            "description": {"mapping": "description", "type": str, "sanitize": True},
-            "author": {"mapping": "reporter", "type": dict, "sanitize": True},
-            "assigned_to": {"mapping": "assignee", "type": dict, "sanitize": True},
-            "project": {"mapping": "project", "type": dict, "sanitize": True},  # Assuming project maps to category
-            "priority": {"mapping": "priority", "type": dict, "sanitize": True},
-            "start_date": {"mapping": "customfield_10015", "type": str, "sanitize": False},
-            "due_date": {"mapping": "duedate", "type": str, "sanitize": False},
-            "created_on": {"mapping": "customfield_10075", "type": str, "sanitize": False},
-            "updated_on": {"mapping": "customfield_10076", "type": str, "sanitize": False},
-            "closed_on": {"mapping": "customfield_10077", "type": str, "sanitize": False},
-            "estimated_hours": {"mapping": "customfield_10078", "type": int, "sanitize": False},
-            "labels": {"mapping": "labels", "type": list, "sanitize": True},  # For Labels, it will depend on how those are structured in your input
-            "fix_versions": {"mapping": "fixVersions", "type": list, "sanitize": True},  # For Fix Versions, it will depend on how those are structured in your input
-            "attachments": {"mapping": "attachments", "type": list, "sanitize": True},  # For Attachments, may require special handling, depending on their structure
-            "journals": {"mapping": "journals", "type": list, "sanitize": True},  # For Journals, may require special handling, depending on their structure
-        }
-
-        self.status_mappings = {
-            "New": {"mapping": "1", "type": int, "sanitize": False},
-            "In Progress": {"mapping": "2", "type": int, "sanitize": False},
-            "Ready For Testing": {"mapping": "3", "type": int, "sanitize": False},
-            "Feedback": {"mapping": "4", "type": int, "sanitize": False},
-            "Closed": {"mapping": "5", "type": int, "sanitize": False},
-            "Rejected": {"mapping": "6", "type": int, "sanitize": False},
-            "Approved": {"mapping": "7", "type": int, "sanitize": False},
-            "Re-Opened": {"mapping": "8", "type": int, "sanitize": False},
-            "Won't Fix": {"mapping": "9", "type": int, "sanitize": False},
-            "On Hold": {"mapping": "10", "type": int, "sanitize": False},
-            "In Review": {"mapping": "11", "type": int, "sanitize": False},
-        }
-
-        self.priority_mappings = {
-            "(1) Immediate": {"mapping": "Highest", "type": str, "sanitize": False},
-            "(2) Urgent": {"mapping": "High", "type": str, "sanitize": False},
-            "(3) High": {"mapping": "Medium", "type": str, "sanitize": False},
-            "(4) Normal": {"mapping": "Low", "type": str, "sanitize": False},
-            "(5) Low": {"mapping": "Lowest", "type": str, "sanitize": False},
-        }
+            raise JiraExportError(f"Error reading configuration: {e}")
 
     def log_response_content(self, response):
         self.logger.error(JiraImporter.RESPONSE_CONTENT_TEMPLATE, response.content.decode())
 
-    def validate_input(self, input_data, input_types):
-        if isinstance(input_data, input_types):
-            return True
-        else:
-            return False
+    @staticmethod
+    def validate_input(input_data, input_types):
+        return isinstance(input_data, input_types)
 
-    def sanitize_input(self, input_data):
+    @staticmethod
+    def sanitize_input(input_data):
         if isinstance(input_data, str):
-            return html.escape(input_data)
+            return input_data.translate(JiraImporter.HTML_ESCAPE_TABLE)
         else:
             return input_data
 
     def get_field_id(self, field_name):
-        response = requests.get(f"{self.jira_url}field", auth=self.auth)
-        fields = response.json()
-        for field in fields:
-            if field["name"] == field_name:
-                return field["id"]
-        return None
+        if self.field_ids is None:
+            response = self.session.get(self.field_endpoint)
+            response.raise_for_status()
+            # First match wins, as with the old linear scan when several fields share a name
+            field_ids = {}
+            for field in loads(response.content):
+                field_ids.setdefault(field["name"], field["id"])
+            self.field_ids = field_ids
+        return self.field_ids.get(field_name)
 
     def set_field_value(self, jira_issue, field_name, value, field_mapping_dict):
-        if field_name in field_mapping_dict:
-            field_id = field_mapping_dict[field_name]["mapping"]
-
+        # Looked up once, the entry's three settings are read from the local
+        field_mapping = field_mapping_dict.get(field_name)
+        if field_mapping is not None:
             # Validate the input based on its expected type
-            if not self.validate_input(value, field_mapping_dict[field_name]["type"]):
-                self.logger.error(f"Invalid type for {field_name}: {value}")
+            if not isinstance(value, field_mapping["type"]):
+                self.logger.error("Invalid type for %s: %s", field_name, value)
                 return
 
             # If sanitize flag is set to True, sanitize the value
-            if field_mapping_dict[field_name]["sanitize"]:
+            if field_mapping["sanitize"]:
                 value = self.sanitize_input(value)
 
             # Set the value in jira_issue
-            jira_issue["fields"][field_id] = value
+            jira_issue["fields"][field_mapping["mapping"]] = value
         else:
-            self.logger.error(f"Field mapping not found for field name: {field_name}")
+            self.logger.error("Field mapping not found for field name: %s", field_name)
 
     def get_user(self, username):
         if not self.validate_input(username, str):
             raise ValueError(f'Invalid username: {username}')
 
-        sanitized_username = self.sanitize_input(username)
-        headers = {"Accept": "application/json"}
-        response = requests.request(
-            "GET",
-            self.jira_url + "user/search?query=" + sanitized_username,
-            headers=headers,
-            auth=self.auth
-        )
+        if username in self.users:
+            return self.users[username]
+
+        # Passed as a query parameter so names with spaces, '&' or accents are percent-encoded
+        response = self.session.get(self.user_search_endpoint, params={"query": username})
 
         if response.status_code == 200:
-            user_data = response.json()
-            if user_data:
-                return user_data[0]
-            else:
-                return None
+            user_data = loads(response.content)
+            user = user_data[0] if user_data else None
+            self.users[username] = user
+            return user
         else:
-            self.logger.error(f"Failed to fetch user data: {response.content}")
+            # Not cached, a failed search is tried again for the next issue
+            self.logger.error("Failed to fetch user data: %s", response.content)
             return None
 
-    def get_transition_id(self, issue_key, target_status):
-        transitions_url = f"{self.jira_url}issue/{issue_key}/transitions"
-        transitions_response = requests.get(transitions_url, auth=self.auth)
-        transitions_response.raise_for_status()
-        transitions = transitions_response.json().get('transitions', [])
-        for transition in transitions:
-            if transition['to']['name'].lower() == target_status.lower():
-                return transition['id']
-        return None
-
-    def handle_http_error(self, e, error_message):
-        if e.response.status_code == 400:
-            raise JiraBadRequestError('Bad request') from e
-        elif e.response.status_code == 401:
-            raise JiraAuthenticationError('Invalid Jira credentials') from e
-        elif e.response.status_code == 403:
-            raise JiraPermissionError('Jira permission error') from e
-        elif e.response.status_code == 404:
-            raise JiraNotFoundError('Jira issue not found') from e
-        elif e.response.status_code == 408:
-            raise JiraRequestTimeoutError('Request Timeout') from e
-        elif e.response.status_code == 429:
-            raise JiraTooManyRequestsError('Too Many Requests') from e
-        elif 500 <= e.response.status_code < 600:
-            raise JiraServerError('Server Error') from e
+    def get_workflow(self, issue_key, issue_type):
+        # A new issue always starts in its type's initial status, so that status and the transitions out of
+        # it are the same for every issue of the type, Jira is only asked with the first issue of each type
+        workflow = self.workflows.get(issue_type)
+        if workflow is None:
+            status_response = self.session.get(self.issue_endpoint + issue_key, params={"fields": "status"})
+            status_response.raise_for_status()
+            initial_status = loads(status_response.content)["fields"]["status"]["name"].lower()
+
+            transitions_response = self.session.get(self.transitions_endpoint_template % issue_key)
+            transitions_response.raise_for_status()
+            transitions = {}
+            for transition in loads(transitions_response.content).get('transitions', []):
+                transitions.setdefault(transition['to']['name'].lower(), transition['id'])
+
+            workflow = (initial_status, transitions)
+            self.workflows[issue_type] = workflow
+        return workflow
+
+    def post_json(self, url, payload):
+        # Serialized with orjson when installed instead of the stdlib encoder behind requests' json=
+        data = dumps(payload)
+        return self.send_with_retry(lambda: self.session.post(url, data=data, headers=self.JSON_HEADERS))
+
+    def send_with_retry(self, send):
+        # urllib3 never retries a POST, but a 429 means Jira did not process the request, so it is sent again.
+        # observe_rate_limit has already backed the limiter off (past Retry-After when given), the resend only
+        # waits for its next slot. The last 429 is returned for the caller's raise_for_status to report
+        for attempt in range(1, self.MAXIMUM_THROTTLE_RETRIES + 1):
+            response = send()
+            if response.status_code != 429:
+                return response
+
+            self.logger.warning("Jira throttled %s, sending it again (%d/%d)", response.url, attempt, self.MAXIMUM_THROTTLE_RETRIES)
+            self.rate_limiter.wait()
+        return send()
+
+    def parse_retry_after(self, response):
+        # Jira sends Retry-After in seconds, an HTTP date or a missing header leaves the doubled delay alone
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def observe_rate_limit(self, response, *args, **kwargs):
+        # 429s retried inside urllib3 never reach the caller, they only show up in the retry history
+        retries = getattr(response.raw, "retries", None)
+        history = retries.history if retries is not None else ()
+        if response.status_code == 429 or any(entry.status == 429 for entry in history):
+            self.rate_limiter.throttle(self.parse_retry_after(response) if response.status_code == 429 else None)
+        else:
+            self.rate_limiter.success()
+
+    def handle_http_error(self, e, error_message, *args):
+        # error_message is a logging format, its arguments are passed along rather than formatted by the caller
+        status_code = e.response.status_code
+        error = self.HTTP_ERRORS.get(status_code)
+        if error is None and 500 <= status_code < 600:
+            error = (JiraServerError, 'Server Error')
+
+        if error is not None:
+            error_class, message = error
+            raise error_class(message) from e
         else:
-            self.logger.error(f"{error_message}. Error: {str(e)}")
+            self.logger.error(error_message + ". Error: %s", *args, e)
             self.log_response_content(e.response)
             raise JiraExportError('Jira import error') from e
 
-    def is_allowed_file_type(self, filepath):
+    def allowed_mime_type(self, filepath):
+        # allowed_file_types lists extensions, the MIME type is only guessed for files that pass,
+        # and handed back so the upload can label the part without guessing again
+        extension = os.path.splitext(filepath)[1][1:].lower()
+        if extension not in self.allowed_file_types:
+            return None
         mime_type, _ = mimetypes.guess_type(filepath)
-        if mime_type:
-            file_type = mime_type.split('/')[1]
-            return file_type in self.allowed_file_types
-        else:
-            return False
+        return mime_type or "application/octet-stream"
 
     # This is a placeholder for malware checking logic
     def is_malware_infected(self):
         return True
 
     def handle_reporter(self, issue_data, jira_issue):
-        reporter_info = issue_data["issue"].get("author")
-        if not reporter_info:
-            self.logger.warn(f"No reporter found for issue {issue_data['issue']['id']}")
-            return
-
-        old_reporter_name = reporter_info.get("name")
-        if not old_reporter_name:
-            self.logger.warn(f"No reporter name found for issue {issue_data['issue']['id']}")
-            return
-
-        try:
-            new_reporter = self.get_user(old_reporter_name)
-            if not new_reporter:
-                self.logger.warn(f"Could not find reporter with the name ({old_reporter_name}) for issue {issue_data['issue']['id']}")
-                default_user_name = "Anonymous"
-                default_user_id = "63776502489de2f7f46267eb"
-                jira_issue["fields"]["reporter"] = {"name": default_user_name, "id": default_user_id}
-                self.logger.warn(f"Setting reporter to default ({default_user_name}) for issue: {issue_data['issue']['id']}")
-                return
-
-            reporter_id = new_reporter.get("accountId")
-            if not reporter_id:
-                self.logger.warn(f"Could not find account ID for reporter ({old_reporter_name}) for issue {issue_data['issue']['id']}")
-                return
-
-            jira_issue["fields"]["reporter"] = {"id": reporter_id}
-            self.logger.info(f"Setting of reporter ({reporter_id}) completed for issue: {issue_data['issue']['id']}")
-        except Exception as e:
-            self.logger.error(f"Could not set reporter due to error: {str(e)} for issue: {issue_data['issue']['id']}")
+        default_user_name = "Anonymous"
+        default_user_id = "63776502489de2f7f46267eb"
+        self.handle_user_field(issue_data, jira_issue, "author", "reporter",
+                               {"name": default_user_name, "id": default_user_id}, default_user_name)
 
     def handle_assignee(self, issue_data, jira_issue):
-        assignee_info = issue_data["issue"].get("assigned_to")
-        if not assignee_info:
-            self.logger.warn(f"No assignee found for issue {issue_data['issue']['id']}")
+        self.handle_user_field(issue_data, jira_issue, "assigned_to", "assignee", None, "Unassigned")
+
+    def handle_user_field(self, issue_data, jira_issue, source_key, target_field, default_value, default_name):
+        # Reporter and assignee differ only in where the Redmine user is read, where the Jira user goes,
+        # and what is set when Jira has no such user
+        issue = issue_data["issue"]
+        user_info = issue.get(source_key)
+        if not user_info:
+            self.logger.warning("No %s found for issue %s", target_field, issue['id'])
             return
 
-        old_assignee_name = assignee_info.get("name")
-        if not old_assignee_name:
-            self.logger.warn(f"No assignee name found for issue {issue_data['issue']['id']}")
+        old_user_name = user_info.get("name")
+        if not old_user_name:
+            self.logger.warning("No %s name found for issue %s", target_field, issue['id'])
             return
 
         try:
-            new_assignee = self.get_user(old_assignee_name)
-            if not new_assignee:
-                self.logger.warn(f"Could not find assignee with the name ({old_assignee_name}) for issue {issue_data['issue']['id']}")
-                jira_issue["fields"]["assignee"] = None
-                self.logger.warn(f"Setting assignee to default (Unassigned) for issue: {issue_data['issue']['id']}")
+            new_user = self.get_user(old_user_name)
+            if not new_user:
+                self.logger.warning("Could not find %s with the name (%s) for issue %s", target_field, old_user_name, issue['id'])
+                jira_issue["fields"][target_field] = default_value
+                self.logger.warning("Setting %s to default (%s) for issue: %s", target_field, default_name, issue['id'])
                 return
 
-            assignee_id = new_assignee.get("accountId")
-            if not assignee_id:
-                self.logger.warn(f"Could not find account ID for assignee ({old_assignee_name}) for issue {issue_data['issue']['id']}")
+            user_id = new_user.get("accountId")
+            if not user_id:
+                self.logger.warning("Could not find account ID for %s (%s) for issue %s", target_field, old_user_name, issue['id'])
                 return
 
-            jira_issue["fields"]["assignee"] = {"id": assignee_id}
-            self.logger.info(f"Setting of assignee ({assignee_id}) completed for issue: {issue_data['issue']['id']}")
+            jira_issue["fields"][target_field] = {"id": user_id}
+            self.logger.info("Setting of %s (%s) completed for issue: %s", target_field, user_id, issue['id'])
         except Exception as e:
-            self.logger.error(f"Could not set assignee due to error: {str(e)} for issue: {issue_data['issue']['id']}")
+            self.logger.error("Could not set %s due to error: %s for issue: %s", target_field, e, issue['id'])
 
     def handle_priority(self, issue_data, jira_issue):
         field_name = "priority"
@@ -311,95 +424,74 @@ class JiraImporter:
             old_priority_name = old_priority["name"]
 
             # Check if old_priority_name exists in priority_mappings
-            if old_priority_name in self.priority_mappings:
-                new_priority_name = self.priority_mappings[old_priority_name]["mapping"]
+            priority_mapping = PRIORITY_MAPPINGS.get(old_priority_name)
+            if priority_mapping is not None:
+                new_priority_name = priority_mapping["mapping"]
 
                 # If sanitize flag is set to True, sanitize the value
-                if self.priority_mappings[old_priority_name]["sanitize"]:
+                if priority_mapping["sanitize"]:
                     new_priority_name = self.sanitize_input(new_priority_name)
 
                 # Build a dictionary to fit Jira's expected format for priority field
                 new_priority_value = {"name": new_priority_name}
 
                 # Use set_field_value to handle setting the value and error handling
-                self.set_field_value(jira_issue, field_name, new_priority_value, self.fields_mappings)
+                self.set_field_value(jira_issue, field_name, new_priority_value, FIELDS_MAPPINGS)
 
     def handle_category(self, issue_data, jira_issue):
         field_name = "category"
         category = issue_data["issue"].get(field_name)
         
         if category and "name" in category:
-            category_name = category["name"].strip()
-            if " " in category_name:
-                category_name = category_name.replace(" ", "_")
-            
+            category_name = category["name"].strip().translate(self.LABEL_TABLE)
+
             # Use set_field_value to handle setting the value and error handling
-            self.set_field_value(jira_issue, "labels", [category_name], self.fields_mappings)
+            self.set_field_value(jira_issue, "labels", [category_name], FIELDS_MAPPINGS)
         else:
-            self.set_field_value(jira_issue, "labels", [], self.fields_mappings)
-
-    def handle_start_date(self, issue_data, jira_issue):
-        field_name = "start_date"
-        if issue_data["issue"].get(field_name):
-            field_value = issue_data["issue"][field_name]
-            self.set_field_value(jira_issue, field_name, field_value, self.fields_mappings)
-
-    def handle_duedate(self, issue_data, jira_issue):
-        field_name = "due_date"
-        if issue_data["issue"].get(field_name):
-            field_value = issue_data["issue"][field_name]
-            self.set_field_value(jira_issue, field_name, field_value, self.fields_mappings)
-
-    def handle_created_on(self, issue_data, jira_issue):
-        field_name = "created_on"
-        if issue_data["issue"].get(field_name):
-            field_value = issue_data["issue"][field_name]
-            self.set_field_value(jira_issue, field_name, field_value, self.fields_mappings)
-
-    def handle_updated_on(self, issue_data, jira_issue):
-        field_name = "updated_on"
-        if issue_data["issue"].get(field_name):
-            field_value = issue_data["issue"][field_name]
-            self.set_field_value(jira_issue, field_name, field_value, self.fields_mappings)
-
-    def handle_closed_on(self, issue_data, jira_issue):
-        field_name = "closed_on"
-        if issue_data["issue"].get(field_name):
-            field_value = issue_data["issue"][field_name]
-            self.set_field_value(jira_issue, field_name, field_value, self.fields_mappings)
+            self.set_field_value(jira_issue, "labels", [], FIELDS_MAPPINGS)
+
+    def handle_field(self, issue_data, jira_issue, field_name):
+        field_value = issue_data["issue"].get(field_name)
+        if field_value:
+            self.set_field_value(jira_issue, field_name, field_value, FIELDS_MAPPINGS)
 
     def handle_dates(self, issue_data, jira_issue):
-        self.handle_start_date(issue_data, jira_issue)
-        self.handle_duedate(issue_data, jira_issue)
-        self.handle_created_on(issue_data, jira_issue)
-        self.handle_updated_on(issue_data, jira_issue)
-        self.handle_closed_on(issue_data, jira_issue)
+        for field_name in self.DATE_FIELDS:
+            self.handle_field(issue_data, jira_issue, field_name)
 
     def handle_estimated_hours(self, issue_data, jira_issue):
-        field_name = "estimated_hours"
-        if issue_data["issue"].get(field_name):
-            field_value = issue_data["issue"][field_name]
-            self.set_field_value(jira_issue, field_name, field_value, self.fields_mappings)
+        self.handle_field(issue_data, jira_issue, "estimated_hours")
 
     def handle_attachments(self, issue_key, issue_data):
         if not self.validate_input(issue_data["attachments"], list):
-            self.logger.error(f"Invalid type for attachments: {issue_data['attachments']}")
+            self.logger.error("Invalid type for attachments: %s", issue_data['attachments'])
             return
 
+        # Every attachment of an issue sits in the same directory, joined once instead of per file
+        attachments_dir = os.path.join(self.attachments_dir, str(issue_data["issue"]["id"]))
+        batches = [[]]
+        batch_size = 0
         for attachment in issue_data["attachments"]:
-            attachment_path = os.path.join(self.attachments_dir, str(issue_data["issue"]["id"]), attachment)
-            if not os.path.isfile(attachment_path):
-                self.logger.warn(f"Attachment file not found: {attachment_path}")
+            attachment_path = os.path.join(attachments_dir, attachment)
+            # One stat answers both the existence and the size check
+            try:
+                attachment_stat = os.stat(attachment_path)
+            except OSError:
+                attachment_stat = None
+            if attachment_stat is None or not stat.S_ISREG(attachment_stat.st_mode):
+                self.logger.warning("Attachment file not found: %s", attachment_path)
                 continue
 
             # File size check
-            if os.path.getsize(attachment_path) > int(self.maximum_file_size):
-                self.logger.error(f"Attachment file is too large: {attachment_path}")
+            file_size = attachment_stat.st_size
+            if file_size > self.maximum_file_size:
+                self.logger.error("Attachment file is too large: %s", attachment_path)
                 continue
 
             # File type check
-            if not self.is_allowed_file_type(attachment_path):
-                self.logger.error(f"Disallowed file type in attachment: {attachment_path}")
+            mime_type = self.allowed_mime_type(attachment_path)
+            if mime_type is None:
+                self.logger.error("Disallowed file type in attachment: %s", attachment_path)
                 continue
 
             # File name sanitization
@@ -407,27 +499,60 @@ class JiraImporter:
 
             # malware check logic
             # if not self.is_malware_infected(attachment_path):
-            #     self.logger.error(f"Attachment file contains malware: {attachment_path}")
+            #     self.logger.error("Attachment file contains malware: %s", attachment_path)
             #     continue
 
-            with open(attachment_path, "rb") as file:
-                try:
-                    response = requests.post(
-                        f"{self.jira_url}issue/{issue_key}/attachments",
+            # Without the streaming encoder requests builds the multipart body in memory,
+            # so a batch is then never allowed to grow past one maximum size file
+            if MultipartEncoder is None and batches[-1] and batch_size + file_size > self.maximum_file_size:
+                batches.append([])
+                batch_size = 0
+            batches[-1].append((sanitized_filename, attachment_path, mime_type))
+            batch_size += file_size
+
+        for batch in batches:
+            if batch:
+                self.upload_attachments(issue_key, issue_data, batch)
+
+    def upload_attachments(self, issue_key, issue_data, uploads):
+        # Jira takes any number of "file" parts on one request, a whole batch goes up in a single round trip
+        with ExitStack() as stack:
+            try:
+                files = [
+                    ("file", (filename, stack.enter_context(open(path, "rb", buffering=self.UPLOAD_BUFFER)), mime_type))
+                    for filename, path, mime_type in uploads
+                ]
+
+                def send():
+                    # A throttled upload is sent again from the start of every file
+                    for _, (_, file, _) in files:
+                        file.seek(0)
+                    if MultipartEncoder is not None:
+                        # Streams the parts straight from the open files, memory stays flat whatever the attachment sizes
+                        encoder = MultipartEncoder(fields=files)
+                        return self.session.post(
+                            self.attachments_endpoint_template % issue_key,
+                            headers={"X-Atlassian-Token": "no-check", "Content-Type": encoder.content_type},
+                            data=encoder
+                        )
+                    return self.session.post(
+                        self.attachments_endpoint_template % issue_key,
                         headers={"X-Atlassian-Token": "no-check"},
-                        files={"file": (sanitized_filename, file)},
-                        auth=self.auth
+                        files=files
                     )
-                    response.raise_for_status()
-                except requests.HTTPError as e:
-                    self.handle_http_error(e, f"Error occurred while uploading attachment to Jira issue {issue_key}")
-                except Exception as e:
-                    self.logger.error(f"Error occurred while uploading attachment to Jira issue {issue_key}. Error: {str(e)}")
-                    raise JiraAttachmentError(f"Uploading attachment failed for issue {issue_data['issue']['id']}") from e
+
+                response = self.send_with_retry(send)
+                response.raise_for_status()
+                self.logger.info("Uploaded %s attachments to Jira issue %s", len(uploads), issue_key)
+            except requests.HTTPError as e:
+                self.handle_http_error(e, "Error occurred while uploading attachments to Jira issue %s", issue_key)
+            except Exception as e:
+                self.logger.error("Error occurred while uploading attachments to Jira issue %s. Error: %s", issue_key, e)
+                raise JiraAttachmentError(f"Uploading attachments failed for issue {issue_data['issue']['id']}") from e
 
     def handle_journals(self, journal, issue_key):
         if not self.validate_input(journal, dict):
-            self.logger.error(f"Invalid type for journal: {journal}")
+            self.logger.error("Invalid type for journal: %s", journal)
             return
 
         comment_body = journal["notes"]
@@ -441,93 +566,224 @@ class JiraImporter:
         }
 
         try:
-            response = requests.post(f"{self.jira_url}issue/{issue_key}/comment", auth=self.auth, json=jira_comment)
+            response = self.post_json(self.comment_endpoint_template % issue_key, jira_comment)
             response.raise_for_status()
-            self.logger.info(f"Successfully uploaded journal comment for issue: {issue_key}")
+            self.logger.info("Successfully uploaded journal comment for issue: %s", issue_key)
         except requests.HTTPError as e:
-            self.handle_http_error(e, f"Failed to add comment for issue {issue_key}")
+            self.handle_http_error(e, "Failed to add comment for issue %s", issue_key)
         except Exception as e:
-            self.logger.error(f"Failed to add comment for issue {issue_key}: {str(e)}")
+            self.logger.error("Failed to add comment for issue %s: %s", issue_key, e)
             raise JiraExportError(f"Failed to add comment for issue {issue_key}")
 
-    def issues_setup(self, issue_data):
-        with self.rate_limiter:
-            if not self.validate_input(issue_data, dict):
-                raise ValueError(f'Invalid issue data: {issue_data}')
-
-            sanitized_issue_data = copy.deepcopy(issue_data)
-            sanitized_issue_data["issue"]["subject"] = self.sanitize_input(sanitized_issue_data["issue"]["subject"])
-            sanitized_issue_data["issue"]["description"] = self.sanitize_input(sanitized_issue_data["issue"]["description"])
-
-            jira_issue = {
-                "fields": {
-                    "project": {
-                        "key": self.jira_project_key
-                    },
-                    "summary": issue_data["issue"]["subject"],
-                    "description": issue_data["issue"]["description"],
-                    "issuetype": {
-                        "name": issue_data["issue"]["tracker"]["name"]
-                    }
+    def build_jira_issue(self, issue_data):
+        if not self.validate_input(issue_data, dict):
+            raise ValueError(f'Invalid issue data: {issue_data}')
+
+        # Checked up front so dirty export lines are skipped without a KeyError traceback each
+        issue = issue_data.get("issue") or {}
+        if not all(field in issue for field in self.REQUIRED_ISSUE_FIELDS):
+            self.logger.warning("Skipping malformed issue %s", issue.get("id"))
+            return None
+
+        jira_issue = {
+            "fields": {
+                "project": self.project_field,
+                "summary": issue["subject"],
+                "description": issue["description"],
+                "issuetype": {
+                    "name": issue["tracker"]["name"]
                 }
             }
+        }
 
-            self.handle_reporter(issue_data, jira_issue)
-            self.handle_assignee(issue_data, jira_issue)
-            self.handle_dates(issue_data, jira_issue)
-            self.handle_priority(issue_data, jira_issue)
-            self.handle_category(issue_data, jira_issue)
-            self.handle_estimated_hours(issue_data, jira_issue)
+        self.handle_reporter(issue_data, jira_issue)
+        self.handle_assignee(issue_data, jira_issue)
+        self.handle_dates(issue_data, jira_issue)
+        self.handle_priority(issue_data, jira_issue)
+        self.handle_category(issue_data, jira_issue)
+        self.handle_estimated_hours(issue_data, jira_issue)
+        return jira_issue
+
+    def complete_issue(self, issue_data, jira_issue_key, phase=None):
+        issue_id = issue_data["issue"]["id"]
+        if phase is None:
+            # Recorded as soon as the issue exists, a rerun must not create it again even if the steps below fail
+            phase = self.ISSUE_PHASES[0]
+            self.mark_done(issue_id, jira_issue_key, phase)
+
+        steps = (
+            ("attachments", self.complete_attachments),
+            ("comments", self.complete_comments),
+            ("status", self.complete_status),
+        )
+        # Each step is recorded once it succeeds, a resumed import runs only the ones after the recorded phase
+        for step, handler in steps[self.ISSUE_PHASES.index(phase):]:
+            try:
+                handler(issue_data, jira_issue_key)
+            except Exception:
+                self.logger.error("Issue %s (%s) is incomplete, its %s step failed, a resumed import finishes it",
+                                  issue_id, jira_issue_key, step)
+                raise
+            self.mark_done(issue_id, jira_issue_key, step)
+
+        self.logger.info("Successfully created issue %s in JIRA with key %s", issue_id, jira_issue_key)
+        self.logger.info("-"*50)  # Add separator line at the end of processing an issue
+
+    def complete_attachments(self, issue_data, jira_issue_key):
+        if issue_data.get("attachments"):
+            self.handle_attachments(jira_issue_key, issue_data)
+
+    def complete_comments(self, issue_data, jira_issue_key):
+        # Every journal is recorded once handled, a resume after a failure part way never posts a comment twice
+        issue_id = issue_data["issue"]["id"]
+        _, phase, journals_done = self.done_ids[issue_id]
+        journals = issue_data.get("journals") or ()
+        for index in range(journals_done, len(journals)):
+            self.handle_journals(journals[index], jira_issue_key)
+            self.mark_done(issue_id, jira_issue_key, phase, index + 1)
+
+    def complete_status(self, issue_data, jira_issue_key):
+        # Transform the status after the issue is created
+        issue = issue_data["issue"]
+        issue_id = issue["id"]
+        status_name = issue["status"]["name"]
+        initial_status, transitions = self.get_workflow(jira_issue_key, issue["tracker"]["name"])
+        # The cached workflow is keyed in lower case, the target is folded once to match
+        target_status = status_name.lower()
+        transition_id = transitions.get(target_status)
+        if target_status == initial_status:
+            self.logger.info("Issue %s already starts in status %s, no transition needed", issue_id, status_name)
+        elif transition_id is None:
+            self.logger.error("No transition found to status %s for issue: %s", status_name, issue_id)
+        else:
+            status_url = self.transitions_endpoint_template % jira_issue_key
+            transition_payload = {
+                "transition": {
+                    "id": transition_id
+                }
+            }
+            transition_response = self.post_json(status_url, transition_payload)
+            try:
+                transition_response.raise_for_status()
+                self.logger.info("Status transformed successfully for issue: %s", issue_id)
+            except requests.HTTPError as e:
+                self.handle_http_error(e, "Failed to transform status for issue: %s", issue_id)
+
+    def resume_imported_issue(self, issue_data):
+        # True when an earlier run already created the issue, its unfinished steps are completed instead of a new create
+        if not self.validate_input(issue_data, dict):
+            return False
+        issue_id = (issue_data.get("issue") or {}).get("id")
+        if issue_id not in self.done_ids:
+            return False
+
+        jira_issue_key, phase, _ = self.done_ids[issue_id]
+        if phase == self.ISSUE_PHASES[-1]:
+            self.logger.info("Issue %s was already imported to JIRA as %s, skipping", issue_id, jira_issue_key)
+        else:
+            self.logger.info("Issue %s was already created in JIRA as %s, finishing the steps after %s",
+                             issue_id, jira_issue_key, phase)
+            with self.rate_limiter:
+                self.complete_issue(issue_data, jira_issue_key, phase)
+        return True
+
+    def issues_setup(self, issue_data):
+        if self.resume_imported_issue(issue_data):
+            return
+        jira_issue = self.build_jira_issue(issue_data)
+        if jira_issue is None:
+            return
+        issue_id = issue_data["issue"]["id"]
 
+        # One limiter slot per issue, covering its creation and every follow-up call
+        with self.rate_limiter:
             try:
-                response = requests.post(f"{self.jira_url}issue/", auth=self.auth, json=jira_issue)
+                response = self.post_json(self.issue_endpoint, jira_issue)
                 response.raise_for_status()
 
                 try:
-                    jira_issue_key = response.json()["key"]
-                except json.JSONDecodeError:
+                    jira_issue_key = loads(response.content)["key"]
+                except ValueError:
+                    # json and orjson decode errors are both ValueErrors
                     self.logger.error("Could not decode JSON response: %s", response.text)
                     return
 
-                if issue_data.get("attachments"):
-                    self.handle_attachments(jira_issue_key, issue_data)
-
-                if issue_data.get("journals"):
-                    for journal in issue_data["journals"]:
-                        self.handle_journals(journal, jira_issue_key)
-
-                # Transform the status after the issue is created
-                status_name = issue_data["issue"]["status"]["name"]
-                transition_id = self.get_transition_id(jira_issue_key, status_name)
-                if transition_id is None:
-                    self.logger.error(f"No transition found to status {status_name} for issue: {issue_data['issue']['id']}")
-                else:
-                    status_url = f"{self.jira_url}issue/{jira_issue_key}/transitions"
-                    transition_payload = {
-                        "transition": {
-                            "id": transition_id
-                        }
-                    }
-                    transition_response = requests.post(status_url, auth=self.auth, json=transition_payload)
-                    try:
-                        transition_response.raise_for_status()
-                        self.logger.info(f"Status transformed successfully for issue: {issue_data['issue']['id']}")
-                    except requests.HTTPError as e:
-                        self.handle_http_error(e, f"Failed to transform status for issue: {issue_data['issue']['id']}: {str(e)}")
-
-                self.logger.info(f"Successfully created issue {issue_data['issue']['id']} in JIRA with key {jira_issue_key}")
-                self.logger.info("-"*50)  # Add separator line at the end of processing an issue
-                    
+                self.complete_issue(issue_data, jira_issue_key)
             except requests.HTTPError as e:
-                self.handle_http_error(e, f"Failed creating issue {issue_data['issue']['id']} in JIRA with key {jira_issue_key}")
+                self.handle_http_error(e, "Failed creating issue %s in JIRA", issue_id)
             except Exception as e:
-                self.logger.error("An error occurred during Jira import: %s", str(e))
+                self.logger.error("An error occurred during Jira import: %s", e)
                 raise JiraExportError('Jira import error')
 
+    def issues_setup_bulk(self, issues_data):
+        # One issue/bulk request creates the whole batch, attachments, comments and transitions still go per issue
+        built = []
+        for issue_data in issues_data:
+            try:
+                if self.resume_imported_issue(issue_data):
+                    continue
+                jira_issue = self.build_jira_issue(issue_data)
+                if jira_issue is not None:
+                    built.append((issue_data, jira_issue))
+            except Exception as e:
+                self.logger.error("An error occurred while preparing issue for import: %s", e)
+        if not built:
+            return
+
+        issue_ids = [issue_data["issue"]["id"] for issue_data, _ in built]
+        with self.rate_limiter:
+            try:
+                response = self.post_json(self.bulk_issue_endpoint, {"issueUpdates": [jira_issue for _, jira_issue in built]})
+                try:
+                    result = loads(response.content)
+                except ValueError:
+                    result = None
+
+                # Jira answers 400 when every element failed, the per element errors are still in the body
+                if not (response.status_code == 400 and result and result.get("errors")):
+                    response.raise_for_status()
+            except requests.RequestException as e:
+                # None of the batch was created, name every issue so they can be found and imported again
+                self.logger.error("Failed creating issues %s in JIRA: %s", issue_ids, e)
+                if isinstance(e, requests.HTTPError):
+                    self.handle_http_error(e, "Failed creating issues in JIRA")
+                raise
+
+        if result is None:
+            # Jira accepted the batch but the keys are unknown, none of it can be recorded as done
+            self.logger.error("Could not decode the bulk response, issues %s were possibly created in JIRA: %s",
+                              issue_ids, response.text)
+            raise JiraExportError('Jira import error')
+
+        # "issues" lists the created ones in request order, failures are reported by element number instead
+        failed = {error.get("failedElementNumber"): error for error in result.get("errors", [])}
+        created = iter(result.get("issues", []))
+        self.logger.info("Created %d of %d issues in JIRA in one bulk request", len(result.get("issues", [])), len(built))
+        for element, (issue_data, _) in enumerate(built):
+            issue_id = issue_data["issue"]["id"]
+            if element in failed:
+                self.logger.error("Failed creating issue %s in JIRA: %s", issue_id, failed[element].get('elementErrors'))
+                continue
+
+            created_issue = next(created, None)
+            if created_issue is None:
+                self.logger.error("Jira returned no key for issue %s", issue_id)
+                continue
+
+            try:
+                # The follow-up calls take one limiter slot per issue, as issues_setup does
+                with self.rate_limiter:
+                    self.complete_issue(issue_data, created_issue["key"])
+            except Exception as e:
+                # Attachments or a transition failing on one issue must not hold back the rest of the batch
+                self.logger.error("An error occurred while completing issue %s in JIRA: %s", issue_id, e)
+
     def import_issues(self, filename):
         checkpoint_file = "issue_progress.log"
+        done_file = "issue_done.log"
         start_from_checkpoint = False
         checkpoint_id = 0
+        checkpoint_offset = 0
 
         if os.path.isfile(checkpoint_file):
             options = [
@@ -544,12 +800,13 @@ class JiraImporter:
 
             if user_choice == "1":
                 os.remove(checkpoint_file)
-                self.logger.info(f"Deleted checkpoint file: {checkpoint_file}")
+                self.logger.info("Deleted checkpoint file: %s", checkpoint_file)
             elif user_choice == "2":
-                with open(checkpoint_file, "r") as f:
-                    checkpoint_id = int(f.read())
+                checkpoint_id, checkpoint_offset = self.read_checkpoint(checkpoint_file)
+                # Batches finished out of order are past the checkpoint, their issues are skipped by id instead
+                self.done_ids = self.read_done_ids(done_file)
                 start_from_checkpoint = True
-                self.logger.info(f"Resuming from issue index: {checkpoint_id}")
+                self.logger.info("Resuming from issue index: %s", checkpoint_id)
             elif user_choice == "3":
                 self.logger.info("Exiting...")
                 return
@@ -557,39 +814,180 @@ class JiraImporter:
                 self.logger.info("Invalid choice. Exiting...")
                 return
 
+        # Batches of lines are imported by several workers, the checkpoint only moves past a batch once
+        # it and every batch before it are done, so a resume never skips one still in flight
+        progress = ProgressWindow(0)
+        # Last line number and the byte offset just past it for each in-flight batch,
+        # the checkpoint stores both so a resume can seek straight there
+        batch_ends = {}
+
+        def read_batches(f):
+            if checkpoint_offset is not None:
+                f.seek(checkpoint_offset)
+            else:
+                # Checkpoints written before offsets were recorded only know the line number, read past those lines once
+                deque(itertools.islice(f, checkpoint_id), maxlen=0)
+            offset = f.tell()
+            lines = enumerate(f, checkpoint_id + 1)
+            for batch_num in itertools.count(1):
+                batch = list(itertools.islice(lines, self.bulk_size))
+                if not batch:
+                    return
+                offset += sum(len(line) for _, line in batch)
+                batch_ends[batch_num] = (batch[-1][0], offset)
+                yield batch_num, [line for _, line in batch]
+
+        def on_complete(batch_num, future):
+            previous_batch = progress.position
+            current_batch = progress.complete(batch_num)
+            if current_batch != previous_batch:
+                line_num, offset = batch_ends[current_batch]
+                for done_batch in range(previous_batch + 1, current_batch + 1):
+                    del batch_ends[done_batch]
+                self.save_checkpoint(line_num, offset)
+
+        self.warm_up()
+
         # eline
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    if start_from_checkpoint and line_num <= checkpoint_id:
-                        continue
-
-                    try:
-                        issue_data = json.loads(line)
-                        self.issues_setup(issue_data)
-                    except Exception as e:
-                        self.logger.error("An error occurred during issue import: %s", str(e))
-                        self.logger.error("Skipping issue data: %s", line)
-
-                    checkpoint_id = line_num
-                    with open(checkpoint_file, "w") as f:
-                        f.write(str(checkpoint_id))
+            self.open_checkpoint(checkpoint_file, checkpoint_id, checkpoint_offset)
+            self.open_done_ids(done_file, start_from_checkpoint)
+            # Lines stay bytes, orjson parses them without a decode step
+            with open(filename, "rb", buffering=self.INPUT_BUFFER) as f:
+                run_in_workers(self.import_batch, read_batches(f), self.concurrency, on_complete)
         # eline
         except KeyboardInterrupt:
             self.logger.info("Script interrupted by user.")
             sys.exit(0)
+        finally:
+            self.close_checkpoint()
+            self.close_done_ids()
+            self.close()
+
+    def read_checkpoint(self, checkpoint_file):
+        # "<line>,<byte offset>", or just "<line>" for older checkpoints
+        with open(checkpoint_file, "r") as f:
+            line_num, _, offset = f.read().strip().partition(",")
+        return int(line_num), int(offset) if offset else None
+
+    def warm_up(self):
+        # Pays the TCP and TLS handshake before the first issue, the pool hands the connection on to the workers
+        try:
+            self.session.head(self.myself_endpoint, timeout=self.WARM_UP_TIMEOUT)
+        except requests.RequestException as e:
+            self.logger.debug("Jira connection warm-up failed: %s", e)
+
+    def open_checkpoint(self, checkpoint_file, checkpoint_id, checkpoint_offset):
+        # One handle for the whole import, every advance is a single write at offset 0 instead of open/truncate/close
+        self.checkpoint = open(checkpoint_file, "w")
+        self.save_checkpoint(checkpoint_id, checkpoint_offset)
+        self.write_checkpoint()
+
+    def save_checkpoint(self, checkpoint_id, offset=None):
+        # A checkpoint behind the real position only rereads lines, their issues are skipped by id,
+        # so the file is written every few advances instead of on each one
+        self.checkpoint_position = (checkpoint_id, offset)
+        self.checkpoint_dirty_count += 1
+
+        if (self.checkpoint_dirty_count >= self.CHECKPOINT_SAVE_EVERY
+                or time.monotonic() - self.checkpoint_saved_at >= self.CHECKPOINT_SAVE_SECONDS):
+            self.write_checkpoint()
+
+    def write_checkpoint(self):
+        if self.checkpoint is None or self.checkpoint_dirty_count == 0:
+            return
+
+        checkpoint_id, offset = self.checkpoint_position
+        entry = str(checkpoint_id) if offset is None else f"{checkpoint_id},{offset}"
+        self.checkpoint.seek(0)
+        self.checkpoint.write(entry.ljust(self.CHECKPOINT_WIDTH))
+        self.checkpoint.flush()
+
+        self.checkpoint_dirty_count = 0
+        self.checkpoint_saved_at = time.monotonic()
+
+    def close_checkpoint(self):
+        if self.checkpoint is not None:
+            # The last position is written and synced on every exit, interrupted or not
+            self.write_checkpoint()
+            os.fsync(self.checkpoint.fileno())
+            self.checkpoint.close()
+            self.checkpoint = None
+
+    def read_done_ids(self, done_file):
+        # "<redmine id>,<jira key>,<phase>,<journals handled>" per line and the last line of an issue wins.
+        # Files written before phases (or keys) were recorded only listed finished issues, those lines count as complete
+        done_ids = {}
+        if not os.path.isfile(done_file):
+            return done_ids
+        with open(done_file, "r") as f:
+            for line in f:
+                fields = line.strip().split(",")
+                if fields[0]:
+                    jira_issue_key = fields[1] if len(fields) > 1 and fields[1] else None
+                    phase = fields[2] if len(fields) > 2 else self.ISSUE_PHASES[-1]
+                    journals_done = int(fields[3]) if len(fields) > 3 else 0
+                    done_ids[int(fields[0])] = (jira_issue_key, phase, journals_done)
+        return done_ids
+
+    def open_done_ids(self, done_file, resume):
+        # Appends of a single line are atomic and synced straight to disk, so the file survives a crash or kill
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_SYNC", 0)
+        if not resume:
+            flags |= os.O_TRUNC
+        self.done_fd = os.open(done_file, flags)
+
+    def mark_done(self, issue_id, jira_issue_key, phase, journals_done=0):
+        self.done_ids[issue_id] = (jira_issue_key, phase, journals_done)
+        if self.done_fd is not None:
+            os.write(self.done_fd, f"{issue_id},{jira_issue_key},{phase},{journals_done}\n".encode())
+
+    def close_done_ids(self):
+        if self.done_fd is not None:
+            os.close(self.done_fd)
+            self.done_fd = None
+
+    def import_batch(self, batch_num, lines):
+        # A bulk size of 1 keeps to the single issue endpoint, for Jira setups that reject issue/bulk
+        if self.bulk_size == 1:
+            for line in lines:
+                self.import_line(line)
+            return
+
+        issues_data = []
+        for line in lines:
+            try:
+                issues_data.append(loads(line))
+            except ValueError as e:
+                self.logger.error("An error occurred during issue import: %s", e)
+                self.logger.error("Skipping issue data: %s", line.decode("utf-8", errors="replace"))
+
+        try:
+            self.issues_setup_bulk(issues_data)
+        except Exception as e:
+            self.logger.error("An error occurred during issue import: %s", e)
+
+    def import_line(self, line):
+        try:
+            issue_data = loads(line)
+            self.issues_setup(issue_data)
+        except Exception as e:
+            self.logger.error("An error occurred during issue import: %s", e)
+            self.logger.error("Skipping issue data: %s", line.decode("utf-8", errors="replace"))
+
+    def close(self):
+        self.session.close()
 
     def run(self, args):
         configure_logging(args.debug)
         
         if args.project and not args.activate_extraction:
             extracted_issues = []
-            self.logger.info(f"Extracted {len(extracted_issues)} issues for project: {args.project}")
+            self.logger.info("Extracted %d issues for project: %s", len(extracted_issues), args.project)
 
             # Save extracted issues to a file
-            with open(args.filename, "w") as f:
-                for issue in extracted_issues:
-                    f.write(json.dumps(issue) + "\n")
+            with open(args.filename, "wb") as f:
+                f.writelines(dumps_line(issue) for issue in extracted_issues)
 
         if args.attachments:
             # Handle the -a or --attachments option
@@ -597,11 +995,11 @@ class JiraImporter:
 
         if args.status:
             # Handle the -s or --status option
-            self.logger.info(f"Filtering issues by status: {args.status}")
+            self.logger.info("Filtering issues by status: %s", args.status)
 
         if args.priority:
             # Handle the -pr or --priority option
-            self.logger.info(f"Filtering issues by priority: {args.priority}")
+            self.logger.info("Filtering issues by priority: %s", args.priority)
 
         if args.activate_extraction:
             self.import_issues(args.filename)
@@ -5,10 +5,13 @@
 # ############################################################################## #
 
 import os
+import atexit
+import queue
 import coloredlogs
 import logging
 
-from logging.handlers import RotatingFileHandler
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 DEFAULT_LOG_FORMAT = "[%(asctime)s] %(levelname)s %(message)s"
 DEFAULT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
@@ -25,6 +28,8 @@ def configure_logging(debug_mode=False, log_format=DEFAULT_LOG_FORMAT, datefmt=D
     else:
         coloredlogs.install(level=level, fmt=log_format, datefmt=datefmt)
 
+# Memoized, so creating a second importer or exporter reuses the logger instead of stacking another file handler on it
+@lru_cache(maxsize=None)
 def setup_logger(prefix, log_dir, log_file_name, log_format=DEFAULT_LOG_FORMAT, datefmt=DEFAULT_DATE_FORMAT):
     # Create full log directory path with prefix
     full_log_dir = os.path.join(log_dir, prefix)
@@ -35,7 +40,8 @@ def setup_logger(prefix, log_dir, log_file_name, log_format=DEFAULT_LOG_FORMAT,
     # Full path to the log file
     log_file = os.path.join(full_log_dir, log_file_name)
 
-    logger = logging.getLogger(__name__)
+    # One logger per prefix, the importer and exporter each write only to their own file
+    logger = logging.getLogger(f"{__name__}.{prefix}")
     logger.setLevel(logging.DEBUG)
 
     formatter = logging.Formatter(log_format, datefmt)
@@ -44,7 +50,14 @@ def setup_logger(prefix, log_dir, log_file_name, log_format=DEFAULT_LOG_FORMAT,
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
+    # Workers only enqueue their records, a listener thread does the file writes and rotation checks
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    # Stopping drains whatever is still queued into the file before the process exits
+    atexit.register(listener.stop)
+
+    logger.addHandler(QueueHandler(log_queue))
 
     return logger
 
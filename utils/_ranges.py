@@ -3,3 +3,18 @@
 # Website https://poltersanctuary.com                                            #
 # Github  https://github.com/PolterEnterprise                                    #
 # ############################################################################## #
+
+import itertools
+
+
+def page_offsets(start, total, page_size):
+    return range(start, total, page_size)
+
+
+def windows(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        window = list(itertools.islice(iterator, size))
+        if not window:
+            return
+        yield window
@@ -8,28 +8,48 @@ import time
 import threading
 
 class RateLimiter:
-    def __init__(self, delay):
+    def __init__(self, delay, minimum_delay=None, maximum_delay=60.0, step=0.1):
         self.delay = delay
+        # Without a minimum the configured delay is never undercut, the limiter only backs off from it
+        self.minimum_delay = delay if minimum_delay is None else minimum_delay
+        self.maximum_delay = max(maximum_delay, delay)
+        self.step = step
         self.lock = threading.Lock()
-        self.last_request_time = time.perf_counter()
+        self.next_allowed_time = time.monotonic()
 
-    def wait(self):
+    def reserve(self):
+        # Claim the next free slot and return how long the caller has to wait for it
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_allowed_time, now)
+            self.next_allowed_time = slot + self.delay
+            return slot - now
+
+    def success(self):
+        # Additive increase: every accepted request shaves a step off the delay
         with self.lock:
-            try:
-                elapsed_time = time.perf_counter() - self.last_request_time
-                if elapsed_time < self.delay:
-                    remaining_time = self.delay - elapsed_time
-                    time.sleep(remaining_time)
-                self.last_request_time = time.perf_counter()
-            except Exception as e:
-                print(f"RateLimiter encountered an error: {e}")
-                raise
+            self.delay = max(self.minimum_delay, self.delay - self.step)
+
+    def throttle(self, retry_after=None):
+        # Multiplicative decrease: a 429 doubles the delay, and no slot is handed out before Retry-After passes
+        with self.lock:
+            self.delay = min(self.maximum_delay, max(self.delay * 2, self.step))
+            if retry_after:
+                self.next_allowed_time = max(self.next_allowed_time, time.monotonic() + retry_after)
+
+    def wait(self):
+        try:
+            # Sleep outside the lock so other threads can queue up their own slots meanwhile
+            remaining_time = self.reserve()
+            if remaining_time > 0:
+                time.sleep(remaining_time)
+        except Exception as e:
+            print(f"RateLimiter encountered an error: {e}")
+            raise
 
     def __enter__(self):
         self.wait()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None:
-            # print(f"RateLimiter encountered an error during exit: {exc_val}")
-            # return False to propagate the exception if it's KeyboardInterrupt
-            return False if exc_type is KeyboardInterrupt else True
+        # Never swallow the exception, the caller decides whether a failed request is logged and skipped
+        return False
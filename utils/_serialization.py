@@ -0,0 +1,32 @@
+# ############################################################################## #
+# Created by Polterx, on Saturday, 1st of July, 2023                             #
+# Website https://poltersanctuary.com                                            #
+# Github  https://github.com/PolterEnterprise                                    #
+# ############################################################################## #
+
+import json
+
+# orjson is optional, it is several times faster in both directions and works on bytes directly
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+def dumps_line(data):
+    # orjson writes the newline into its own output buffer, no second copy of a large payload
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data) + "\n").encode("utf-8")
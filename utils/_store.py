@@ -0,0 +1,81 @@
+# ############################################################################## #
+# Created by Polterx, on Saturday, 1st of July, 2023                             #
+# Website https://poltersanctuary.com                                            #
+# Github  https://github.com/PolterEnterprise                                    #
+# ############################################################################## #
+
+import sqlite3
+import threading
+
+from utils._serialization import dumps, loads
+
+
+class JournalStore:
+    # Journals of an issue only change together with its updated_on timestamp, so an issue whose
+    # timestamp matches the stored one can reuse its journals without asking Redmine again
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS journals ("
+                "issue_id INTEGER PRIMARY KEY, updated_on TEXT NOT NULL, journals BLOB NOT NULL)"
+            )
+
+    def get(self, issue_id, updated_on):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT journals FROM journals WHERE issue_id = ? AND updated_on = ?",
+                (issue_id, updated_on)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def put(self, issue_id, updated_on, journals):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO journals (issue_id, updated_on, journals) VALUES (?, ?, ?)",
+                (issue_id, updated_on, dumps(journals))
+            )
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM journals")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class AttachmentManifest:
+    # Remembers where a file with a given Redmine digest and size was first saved. Every upload of the
+    # same file gets its own attachment id, the content is what identifies it across issues, so it is
+    # downloaded once and linked everywhere else
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "digest TEXT NOT NULL, bytes INTEGER NOT NULL, path TEXT NOT NULL, PRIMARY KEY (digest, bytes))"
+            )
+
+    def get(self, digest, size):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT path FROM files WHERE digest = ? AND bytes = ?", (digest, size)
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, rows):
+        if not rows:
+            return
+        # One transaction per batch (an issue's attachments) rather than one per file
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files (digest, bytes, path) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
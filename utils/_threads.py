@@ -3,3 +3,54 @@
 # Website https://poltersanctuary.com                                            #
 # Github  https://github.com/PolterEnterprise                                    #
 # ############################################################################## #
+
+import queue
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+DOWNLOAD_WORKERS = 8
+
+# Shared by every exporter instance so concurrent issues never stack up more than DOWNLOAD_WORKERS transfers
+download_executor = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="download")
+
+_DONE = object()
+
+
+def prefetch(iterable, maxsize=200):
+    # Drains iterable on a background thread into a bounded queue, so producing the next items
+    # (e.g. fetching the next page) overlaps with whatever the consumer does with the current ones
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    threading.Thread(target=produce, name="prefetch", daemon=True).start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
@@ -3,3 +3,43 @@
 # Website https://poltersanctuary.com                                            #
 # Github  https://github.com/PolterEnterprise                                    #
 # ############################################################################## #
+
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class ProgressWindow:
+    # Tracks the highest index below which every item has completed, so work finishing
+    # out of order never moves a checkpoint past an issue that is still in flight
+    def __init__(self, position=0):
+        self.position = position
+        self._completed = set()
+
+    def complete(self, index):
+        self._completed.add(index)
+        while self.position + 1 in self._completed:
+            self.position += 1
+            self._completed.remove(self.position)
+        return self.position
+
+
+def _drain(pending, on_complete, return_when):
+    done, _ = wait(pending, return_when=return_when)
+    for future in done:
+        index = pending.pop(future)
+        if on_complete is not None:
+            on_complete(index, future)
+
+
+def run_in_workers(func, indexed_items, max_workers, on_complete=None):
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+    try:
+        # Only keep a couple of items per worker queued, so a lazy iterable is consumed as the pool frees up
+        for index, item in indexed_items:
+            if len(pending) >= max_workers * 2:
+                _drain(pending, on_complete, FIRST_COMPLETED)
+            pending[executor.submit(func, index, item)] = index
+        _drain(pending, on_complete, ALL_COMPLETED)
+    finally:
+        # On interrupt, let in-flight items finish but drop everything still queued
+        executor.shutdown(wait=True, cancel_futures=True)